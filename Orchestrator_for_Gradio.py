@@ -1,15 +1,17 @@
 import os
 import json
 import openai
+from summarizer import compact_json, summarize_sections
 
 # Set your OpenAI key
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
 
 # 🧠 Call GPT-4o to summarize each section
-from openai import OpenAI
+from agentpro.model import get_openai_client
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# ✅ Shared, pooled client (same connections the agents use)
+client = get_openai_client(os.getenv("OPENAI_API_KEY"))
 
 # 🧠 GPT prompt call using new SDK
 def ask_gpt(prompt):
@@ -76,28 +78,32 @@ def orchestrated_event_plan(user_intent):
     theme = theme_agent(user_intent)
     weather = weather_predictor_agent(user_intent, schedule)
 
-    # --- Step 2: LLM Summaries ---
+    # --- Step 2: LLM Summaries (one batched call, per-section only on failure) ---
     def summarize(section_name, data):
         prompt = (
             f"You are summarizing the '{section_name}' section from an event planning agent.\n"
-            f"Here is the agent output:\n\n{json.dumps(data, indent=2)}\n\n"
+            f"Here is the agent output:\n\n{compact_json(data)}\n\n"
             "Summarize the best 2–3 items. Use bullets or clean formatting.\n"
             "Respond with only JSON — start with Final Answer: and no explanation."
         )
         response = ask_gpt(prompt)
         return extract_json_from_response(response)
 
-    summary = {
-        "venues": summarize("venues", venue_results),
-        "vendors": summarize("vendors", vendor_results),
-        "schedule": summarize("schedule", schedule),
-        "transportation": summarize("transportation", transport),
-        "hotels": summarize("hotels", hotels),
-        "sightseeing": summarize("sightseeing", sightseeing),
-        "catering": summarize("catering", catering),
-        "theme": summarize("theme", theme),
-        "weather_forecast": summarize("weather_forecast", weather)
-    }
+    summary = summarize_sections(
+        {
+            "venues": venue_results,
+            "vendors": vendor_results,
+            "schedule": schedule,
+            "transportation": transport,
+            "hotels": hotels,
+            "sightseeing": sightseeing,
+            "catering": catering,
+            "theme": theme,
+            "weather_forecast": weather
+        },
+        ask=ask_gpt,
+        summarize_one=summarize,
+    )
 
     return {
         "intent": user_intent,
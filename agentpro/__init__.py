@@ -1,2 +1,5 @@
 from .react_agent import ReactAgent
-from .model import create_model
\ No newline at end of file
+from .model import create_model, get_router, get_shared_model
+from .cache import ResponseCache, get_response_cache
+from .usage import get_usage_tracker, track_usage, usage_tags
+from .cassette import ReplayModelClient, use_cassette
\ No newline at end of file
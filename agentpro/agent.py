@@ -1,4 +1,4 @@
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 from pydantic import BaseModel, Field
 import json
 
@@ -24,7 +24,17 @@ class ThoughtStep(BaseModel):
     observation: Optional[Observation] = None  # Result observed after action
     pause_reflection: Optional[str] = None  # Optional reflection if agent paused
 
+# Define the outcome of one prompt in a batch completion
+class BatchResult(BaseModel):
+    content: Optional[str] = None  # Model output, if the prompt succeeded
+    error: Optional[str] = None  # Error message, if it failed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 # Define the full agent response
 class AgentResponse(BaseModel):
     thought_process: List[ThoughtStep]  # Steps including thoughts, actions, and observations
     final_answer: Optional[str] = None  # Final answer after reasoning
+    usage: Optional[Dict[str, Any]] = None  # Tokens, wall time and cost of the model calls made
@@ -0,0 +1,120 @@
+# cache.py
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.environ.get("AGENTPRO_CACHE_PATH", ".agentpro_cache.sqlite")
+
+class ResponseCache:
+    """
+    Persistent, content-addressed cache for model responses (SQLite).
+
+    Entries are keyed by a hash of everything that determines the response
+    (model, temperature, prompts, ...), expire after `ttl` seconds and the
+    least recently used entries are evicted beyond `max_entries`.
+    Caches sharing a file must use different `table`s: size limits, clear()
+    and stats() apply to one table. Safe to share between threads.
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: Optional[float] = 7 * 24 * 3600,
+                 max_entries: int = 10000, table: str = "responses"):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Stable hash of the request parts that determine a response."""
+        encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        """Like get(), but returns (value, created) so callers can tell how old the entry is."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0], row[1]
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            # LRU eviction beyond the size limit
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def items(self, prefix: str = "") -> List[Tuple[str, str, float]]:
+        """Unexpired (key, value, created) entries whose key starts with `prefix` (not counted as hits)."""
+        oldest = time.time() - self.ttl if self.ttl is not None else float("-inf")
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT key, value, created FROM {self.table} WHERE key LIKE ? ESCAPE '\\' AND created >= ?",
+                (pattern, oldest)
+            ).fetchall()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+        }
+
+_default_cache: Optional[ResponseCache] = None
+_default_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache at DEFAULT_CACHE_PATH (set AGENTPRO_CACHE_PATH to move it)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -0,0 +1,296 @@
+# cassette.py
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .model import ModelClient
+
+# Query parameters that carry credentials; they are neither stored nor part of the key
+SECRET_PARAMS = {"key", "api_key", "apikey", "appid", "access_token", "token"}
+
+# Tool actions whose libraries do not go through `requests` (DuckDuckGo uses its own
+# HTTP client), so their results are recorded at the tool level instead
+DEFAULT_TOOL_ACTIONS = ("search",)
+
+# ReactAgent prompts carry today's date; it is left out of keys so cassettes replay on any day
+PROMPT_DATE = re.compile(r"The current date is [A-Z][a-z]+ \d{1,2}, \d{4}")
+
+class CassetteMiss(KeyError):
+    """Replay was asked for an exchange that is not in the cassette."""
+
+class Cassette:
+    """
+    A file of recorded model, HTTP and tool exchanges, keyed by a hash of the request.
+
+    In "record" mode exchanges are captured as they happen (and written on
+    save); in "replay" mode they are served back, after an injected
+    `latency` in seconds (a number, or a dict per channel: "model", "http",
+    "tools"). Identical requests are replayed in the order they were recorded.
+    """
+    CHANNELS = ("model", "http", "tools")
+
+    def __init__(self, path: str, mode: str = "replay", latency: Union[float, Dict[str, float]] = 0.0,
+                 tool_actions: Iterable[str] = DEFAULT_TOOL_ACTIONS):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"❌ Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.tool_actions = set(tool_actions)
+        self._lock = threading.Lock()
+        self._replayed: Dict[tuple, int] = {}
+        self.data: Dict[str, Dict[str, list]] = {channel: {} for channel in self.CHANNELS}
+        if mode == "replay":
+            with open(path, "r", encoding="utf-8") as f:
+                self.data.update(json.load(f))
+
+    @staticmethod
+    def key(**parts: Any) -> str:
+        encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def delay(self, channel: str) -> float:
+        if isinstance(self.latency, dict):
+            return self.latency.get(channel, 0.0)
+        return self.latency
+
+    def record(self, channel: str, key: str, request: Any, response: Any):
+        with self._lock:
+            self.data[channel].setdefault(key, []).append({"request": request, "response": response})
+
+    def replay(self, channel: str, key: str) -> Any:
+        with self._lock:
+            entries = self.data[channel].get(key)
+            if not entries:
+                raise CassetteMiss(f"❌ No recorded {channel} exchange for this request (key {key[:12]})")
+            index = self._replayed.get((channel, key), 0)
+            self._replayed[(channel, key)] = index + 1
+        # Requests made more often than recorded get the last recorded response
+        return entries[min(index, len(entries) - 1)]["response"]
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.data, ensure_ascii=False, indent=1, default=str)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(data)
+        counts = {channel: sum(len(v) for v in self.data[channel].values()) for channel in self.CHANNELS}
+        print(f"📼 Saved cassette {self.path}: {counts}")
+
+def model_key(cassette: Cassette, model_name: str, messages, response_format=None) -> str:
+    undated = [{**message, "content": PROMPT_DATE.sub("The current date is <date>", message["content"])}
+               if isinstance(message.get("content"), str) else message for message in messages]
+    return cassette.key(model=model_name, messages=undated, response_format=response_format)
+
+# ✅ HTTP helpers
+def redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+def _body_digest(body: Any) -> Optional[str]:
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.sha256(body).hexdigest()
+
+def _serialize_response(response: requests.Response) -> Dict[str, Any]:
+    content = response.content
+    try:
+        body = {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        body = {"base64": base64.b64encode(content).decode("ascii")}
+    return {
+        "status_code": response.status_code,
+        "reason": response.reason,
+        "headers": {k: v for k, v in response.headers.items() if k.lower() != "set-cookie"},
+        "encoding": response.encoding,
+        **body,
+    }
+
+def _build_response(request: requests.PreparedRequest, stored: Dict[str, Any]) -> requests.Response:
+    response = requests.Response()
+    response.status_code = stored["status_code"]
+    response.reason = stored.get("reason")
+    response.headers = CaseInsensitiveDict(stored.get("headers", {}))
+    # The stored body is already decoded; stop requests from decompressing it again
+    response.headers.pop("Content-Encoding", None)
+    response.encoding = stored.get("encoding")
+    if "base64" in stored:
+        response._content = base64.b64decode(stored["base64"])
+    else:
+        response._content = stored.get("text", "").encode("utf-8")
+    response.url = request.url
+    response.request = request
+    return response
+
+# ✅ Patching
+class _Patcher:
+    def __init__(self):
+        self._patches = []
+
+    def patch(self, owner: Any, name: str, replacement: Any):
+        own = name in owner.__dict__
+        self._patches.append((owner, name, owner.__dict__.get(name), own))
+        setattr(owner, name, replacement)
+
+    def undo(self):
+        for owner, name, original, own in reversed(self._patches):
+            if own:
+                setattr(owner, name, original)
+            else:
+                delattr(owner, name)
+        self._patches.clear()
+
+def _patch_models(patcher: _Patcher, cassette: Cassette):
+    from .model import LiteLLMClient, OpenAIClient
+
+    for cls in (OpenAIClient, LiteLLMClient):
+        original_chat, original_stream, original_achat = cls.chat, cls.stream_chat, cls.achat
+
+        def chat(self, messages, temperature=None, max_tokens=None, response_format=None,
+                 _original=original_chat):
+            key = model_key(cassette, self.model_name, messages, response_format)
+            if cassette.mode == "replay":
+                started = time.perf_counter()
+                content = cassette.replay("model", key)
+                time.sleep(cassette.delay("model"))
+                self._record_usage(None, started, messages, content)
+                return content
+            content = _original(self, messages, temperature=temperature, max_tokens=max_tokens,
+                                response_format=response_format)
+            cassette.record("model", key, {"model": self.model_name, "messages": messages}, content)
+            return content
+
+        def stream_chat(self, messages, temperature=None, max_tokens=None, stop=None,
+                        _original=original_stream):
+            key = model_key(cassette, self.model_name, messages)
+            if cassette.mode == "replay":
+                started = time.perf_counter()
+                content = cassette.replay("model", key)
+                time.sleep(cassette.delay("model"))
+                try:
+                    for i in range(0, len(content), 16):
+                        yield content[i:i + 16]
+                finally:
+                    self._record_usage(None, started, messages, content)
+                return
+            # Record exactly what the caller consumed (streams may be stopped early)
+            text, stream = "", _original(self, messages, temperature=temperature, max_tokens=max_tokens, stop=stop)
+            try:
+                for chunk in stream:
+                    text += chunk
+                    yield chunk
+            finally:
+                stream.close()
+                cassette.record("model", key, {"model": self.model_name, "messages": messages}, text)
+
+        async def achat(self, messages, temperature=None, max_tokens=None, response_format=None,
+                        _original=original_achat):
+            key = model_key(cassette, self.model_name, messages, response_format)
+            if cassette.mode == "replay":
+                started = time.perf_counter()
+                content = cassette.replay("model", key)
+                await asyncio.sleep(cassette.delay("model"))
+                self._record_usage(None, started, messages, content)
+                return content
+            content = await _original(self, messages, temperature=temperature, max_tokens=max_tokens,
+                                      response_format=response_format)
+            cassette.record("model", key, {"model": self.model_name, "messages": messages}, content)
+            return content
+
+        patcher.patch(cls, "chat", chat)
+        patcher.patch(cls, "stream_chat", stream_chat)
+        patcher.patch(cls, "achat", achat)
+
+def _patch_http(patcher: _Patcher, cassette: Cassette):
+    original_send = requests.Session.send
+
+    def send(session, request, **kwargs):
+        url = redact_url(request.url)
+        key = cassette.key(method=request.method, url=url, body=_body_digest(request.body))
+        if cassette.mode == "replay":
+            stored = cassette.replay("http", key)
+            time.sleep(cassette.delay("http"))
+            return _build_response(request, stored)
+        response = original_send(session, request, **kwargs)
+        cassette.record("http", key, {"method": request.method, "url": url}, _serialize_response(response))
+        return response
+
+    patcher.patch(requests.Session, "send", send)
+
+def _patch_tools(patcher: _Patcher, cassette: Cassette):
+    from .react_agent import ReactAgent
+    original_execute = ReactAgent.execute_tool
+
+    def execute_tool(agent, action):
+        if action.action_type not in cassette.tool_actions:
+            return original_execute(agent, action)
+        key = cassette.key(action=action.action_type, input=action.input)
+        if cassette.mode == "replay":
+            result = cassette.replay("tools", key)
+            time.sleep(cassette.delay("tools"))
+            return result
+        result = original_execute(agent, action)
+        cassette.record("tools", key, {"action": action.action_type, "input": action.input}, result)
+        return result
+
+    patcher.patch(ReactAgent, "execute_tool", execute_tool)
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", latency: Union[float, Dict[str, float]] = 0.0,
+                 tool_actions: Iterable[str] = DEFAULT_TOOL_ACTIONS) -> Iterator[Cassette]:
+    """
+    Record or replay every model call (OpenAI / LiteLLM clients), every
+    outbound `requests` call and the listed tool actions inside this block.
+
+    Replay needs no network or API keys, so a whole event plan can run
+    offline and repeatably, on any day (the date in agent prompts is not
+    part of the model keys). The on-disk LLM response cache is swapped for
+    an empty in-memory one, so recordings never miss calls the cache
+    would have answered. Offline batch jobs are not captured.
+    """
+    from . import cache as cache_module
+
+    cassette = Cassette(path, mode=mode, latency=latency, tool_actions=tool_actions)
+    patcher = _Patcher()
+    previous_cache = cache_module._default_cache
+    cache_module._default_cache = cache_module.ResponseCache(":memory:")
+    print(f"📼 Cassette {mode}: {path}")
+    try:
+        _patch_models(patcher, cassette)
+        _patch_http(patcher, cassette)
+        _patch_tools(patcher, cassette)
+        yield cassette
+    finally:
+        patcher.undo()
+        cache_module._default_cache = previous_cache
+        if mode == "record":
+            cassette.save()
+
+class ReplayModelClient(ModelClient):
+    """
+    ModelClient that answers only from a cassette (no network, no API key),
+    for wiring into a single agent without patching the real clients.
+    """
+    def __init__(self, cassette: Cassette, model_name: str = "gpt-4o", **kwargs):
+        super().__init__(model_name=model_name, **kwargs)
+        self.cassette = cassette
+
+    def chat(self, messages, temperature=None, max_tokens=None, response_format=None) -> str:
+        started = time.perf_counter()
+        key = model_key(self.cassette, self.model_name, messages, response_format)
+        content = self.cassette.replay("model", key)
+        time.sleep(self.cassette.delay("model"))
+        self._record_usage(None, started, messages, content)
+        return content
@@ -1,57 +1,466 @@
 # model.py
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Callable, Iterator, Optional, List, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import io
+import time
+import weakref
 import openai
+import httpx
 import litellm
 from litellm import completion
+import json
 import os
+import threading
+from .agent import BatchResult
+from .cache import ResponseCache, get_response_cache
+from .rate_limit import TokenBucketLimiter, backoff_delay, estimate_tokens, get_rate_limiter, is_retryable
+from .usage import UsageTotals, record_usage, track_usage, usage_tags
+
+# Keep-alive connections per shared HTTP pool (override with AGENTPRO_POOL_SIZE)
+DEFAULT_POOL_SIZE = int(os.environ.get("AGENTPRO_POOL_SIZE", "20"))
+
+# A batch prompt is either a user prompt or a (system prompt, user prompt) pair
+BatchPrompt = Union[str, Tuple[str, str]]
+DEFAULT_BATCH_SYSTEM_PROMPT = "You are a helpful assistant."
+JSON_ONLY_SYSTEM_PROMPT = "You are a helpful assistant that answers with JSON only."
+STRING_LIST_SCHEMA = {"type": "array", "items": {"type": "string"}}
+
+_registry_lock = threading.RLock()
+_openai_clients: Dict[tuple, "openai.OpenAI"] = {}
+_shared_models: Dict[tuple, "ModelClient"] = {}
+
+def get_openai_client(api_key: Optional[str] = None, request_timeout: float = 60.0,
+                      pool_size: int = DEFAULT_POOL_SIZE) -> "openai.OpenAI":
+    """
+    Process-wide OpenAI SDK client for this key / timeout / pool size.
+    The underlying httpx pool keeps connections alive and is thread-safe,
+    so every agent reuses the same TLS connections instead of opening its own.
+    """
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    key = (api_key, request_timeout, pool_size)
+    with _registry_lock:
+        client = _openai_clients.get(key)
+        if client is None:
+            http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                timeout=request_timeout
+            )
+            # Retries are handled by ModelClient so they respect the shared rate limiter
+            client = openai.OpenAI(api_key=api_key, timeout=request_timeout, http_client=http_client,
+                                   max_retries=0)
+            _openai_clients[key] = client
+        return client
 
 class ModelClient:
     """Base class for different model clients"""
-    def __init__(self, model_name: str = None, temperature: float = 0.7, max_tokens: Optional[int] = None):
+    def __init__(self, model_name: str = None, temperature: float = 0.7, max_tokens: Optional[int] = None,
+                 request_timeout: float = 60.0, max_retries: int = 4):
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens or 2048  # Default max_tokens if not provided
+        self.request_timeout = request_timeout  # Seconds before a single API call is abandoned
+        self.max_retries = max_retries  # Retries on 429 / 5xx / timeouts, with backoff
+        self.limiter: TokenBucketLimiter = get_rate_limiter(str(model_name))  # Shared per model
+
+    def _record_usage(self, usage: Any, started: float, messages: List[Dict[str, str]], completion: str = ""):
+        """Record tokens, wall time and cost of one call (estimated if the provider sent no usage)."""
+        if isinstance(usage, dict):
+            prompt_tokens, completion_tokens = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        else:
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            completion_tokens = getattr(usage, "completion_tokens", None)
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(messages, 0)
+        if completion_tokens is None:
+            completion_tokens = len(completion or "") // 4
+        record_usage(self.model_name, prompt_tokens, completion_tokens, time.perf_counter() - started)
+
+    def _record_response(self, response: Any, started: float, messages: List[Dict[str, str]]):
+        if getattr(response, "choices", None) is None:
+            return  # Streams record their usage once they are consumed
+        self._record_usage(getattr(response, "usage", None), started, messages,
+                           response.choices[0].message.content if response.choices else "")
+
+    def _call_with_retry(self, call: Callable[[], Any], messages: List[Dict[str, str]], max_tokens: int) -> Any:
+        """Run one API call under the rate limiter, retrying transient failures."""
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(estimate_tokens(messages, max_tokens))
+            try:
+                response = call()
+                self._record_response(response, started, messages)
+                return response
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt, e)
+                self.limiter.record_retry()
+                print(f"🔁 {type(e).__name__} from {self.model_name}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    async def _acall_with_retry(self, call: Callable[[], Any], messages: List[Dict[str, str]], max_tokens: int) -> Any:
+        """Async version of _call_with_retry; `call` returns an awaitable."""
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.aacquire(estimate_tokens(messages, max_tokens))
+            try:
+                response = await call()
+                self._record_response(response, started, messages)
+                return response
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt, e)
+                self.limiter.record_retry()
+                print(f"🔁 {type(e).__name__} from {self.model_name}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
         
+    def chat(self, messages: List[Dict[str, str]], 
+             temperature: Optional[float] = None, 
+             max_tokens: Optional[int] = None,
+             response_format: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Chat completion over a full message list ({"role", "content"} dicts).
+        Uses instance defaults if parameters not provided. `response_format`
+        is passed to the provider as-is (e.g. JSON mode).
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def stream_chat(self, messages: List[Dict[str, str]], 
+                    temperature: Optional[float] = None, 
+                    max_tokens: Optional[int] = None,
+                    stop: Optional[List[str]] = None) -> Iterator[str]:
+        """
+        Streaming chat completion that yields text chunks as they arrive.
+        Closing the generator early aborts the generation. Clients without
+        native streaming yield the whole completion as a single chunk.
+        """
+        yield self.chat(messages, temperature=temperature, max_tokens=max_tokens)
+
+    async def achat(self, messages: List[Dict[str, str]], 
+                    temperature: Optional[float] = None, 
+                    max_tokens: Optional[int] = None,
+                    response_format: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Async chat completion. Clients without a native async API run the
+        blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self.chat, messages, temperature=temperature,
+                                       max_tokens=max_tokens, response_format=response_format)
+
+    async def achat_completion(self, system_prompt: str, user_prompt: str, 
+                               temperature: Optional[float] = None, 
+                               max_tokens: Optional[int] = None) -> str:
+        """
+        Async chat_completion, so many agents and plans can share one event
+        loop. Rate limiting and retries behave exactly as in the sync path.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        return await self.achat(messages, temperature=temperature, max_tokens=max_tokens)
+
+    def _cache_key(self, cache: ResponseCache, messages: List[Dict[str, str]],
+                   temperature: Optional[float], max_tokens: Optional[int], **extra: Any) -> str:
+        return cache.make_key(
+            model=self.model_name,
+            temperature=temperature if temperature is not None else self.temperature,
+            max_tokens=max_tokens if max_tokens is not None else self.max_tokens,
+            messages=messages,
+            **extra
+        )
+
     def chat_completion(self, system_prompt: str, user_prompt: str, 
                        temperature: Optional[float] = None, 
-                       max_tokens: Optional[int] = None) -> str:
+                       max_tokens: Optional[int] = None,
+                       cache: Optional[ResponseCache] = None,
+                       validate: Optional[Callable[[str], bool]] = None) -> str:
         """
         Chat completion method. Uses instance defaults if parameters not provided.
+        Pass a ResponseCache to reuse earlier answers to the exact same prompts;
+        only do this for deterministic "lookup" prompts, not creative ones.
+        Raises ValueError if `validate` rejects the text; rejected answers are
+        never cached.
         """
-        raise NotImplementedError("Subclasses must implement this method")
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        key = self._cache_key(cache, messages, temperature, max_tokens) if cache else None
+        content = cache.get(key) if cache else None
+        if content is not None and (validate is None or validate(content)):
+            return content
+        content = self.chat(messages, temperature=temperature, max_tokens=max_tokens)
+        if validate is not None and not validate(content):
+            raise ValueError(f"❌ Model response failed validation:\n{content}")
+        if cache:
+            cache.set(key, content)
+        return content
+
+    @staticmethod
+    def _batch_messages(prompt: BatchPrompt) -> List[Dict[str, str]]:
+        system_prompt, user_prompt = prompt if isinstance(prompt, tuple) else (DEFAULT_BATCH_SYSTEM_PROMPT, prompt)
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def batch_chat_completion(self, prompts: List[BatchPrompt],
+                              temperature: Optional[float] = None,
+                              max_tokens: Optional[int] = None,
+                              max_concurrency: int = 8,
+                              offline: bool = False,
+                              poll_interval: float = 30.0) -> List[BatchResult]:
+        """
+        Complete many independent prompts; results keep the input order and a
+        failing prompt yields a BatchResult with `error` instead of failing
+        the batch.
+
+        Online mode runs up to `max_concurrency` prompts at once (through the
+        shared rate limiter). `offline=True` uses the provider's batch
+        endpoint where available (cheaper, but may take hours) and blocks
+        until it completes, polling every `poll_interval` seconds.
+        """
+        if not prompts:
+            return []
+        if offline:
+            try:
+                return self.offline_batch_completion(prompts, temperature, max_tokens, poll_interval)
+            except NotImplementedError:
+                print(f"⚠️ No offline batch endpoint for {type(self).__name__}, running prompts online")
+
+        def complete(prompt: BatchPrompt) -> BatchResult:
+            try:
+                content = self.chat(self._batch_messages(prompt), temperature=temperature, max_tokens=max_tokens)
+                return BatchResult(content=content)
+            except Exception as e:
+                return BatchResult(error=f"{type(e).__name__}: {e}")
+
+        # Each prompt runs in a copy of the caller's context so usage tags follow it
+        contexts = [contextvars.copy_context() for _ in prompts]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(prompts)))) as pool:
+            return list(pool.map(lambda ctx, prompt: ctx.run(complete, prompt), contexts, prompts))
+
+    def offline_batch_completion(self, prompts: List[BatchPrompt],
+                                 temperature: Optional[float] = None,
+                                 max_tokens: Optional[int] = None,
+                                 poll_interval: float = 30.0) -> List[BatchResult]:
+        """Run prompts through the provider's offline batch endpoint (if it has one)."""
+        raise NotImplementedError("Offline batches are not supported by this client")
+
+    def structured_completion(self, system_prompt: str, user_prompt: str,
+                              schema: Optional[Dict[str, Any]] = None,
+                              temperature: Optional[float] = None,
+                              max_tokens: Optional[int] = None,
+                              cache: Optional[ResponseCache] = None,
+                              validate: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Single-shot completion in the provider's JSON response mode.
+
+        With a JSON `schema` the output is constrained to it (non-object
+        schemas such as lists are wrapped, since providers require a top-level
+        object); without one, any JSON object is accepted.
+        Returns the parsed value; raises ValueError if it is not valid JSON or
+        `validate` rejects it. With a `cache`, only responses that parse and
+        pass `validate` are stored and reused (see chat_completion).
+        """
+        wrapped = schema is not None and schema.get("type") != "object"
+        if schema is None:
+            response_format = {"type": "json_object"}
+        else:
+            if wrapped:
+                schema = {"type": "object", "properties": {"result": schema}, "required": ["result"]}
+            response_format = {
+                "type": "json_schema",
+                "json_schema": {"name": "result", "schema": schema, "strict": False}
+            }
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        def parse(content: str) -> Any:
+            try:
+                data = json.loads(content)
+            except (TypeError, json.JSONDecodeError) as e:
+                raise ValueError(f"❌ Model did not return valid JSON: {e}\n{content}")
+            value = data["result"] if wrapped and isinstance(data, dict) and "result" in data else data
+            if validate is not None and not validate(value):
+                raise ValueError(f"❌ Model response failed validation:\n{content}")
+            return value
+
+        key = self._cache_key(cache, messages, temperature, max_tokens,
+                              response_format=response_format) if cache else None
+        content = cache.get(key) if cache else None
+        if content is not None:
+            try:
+                return parse(content)
+            except ValueError:
+                pass  # Stored under a looser check; ask the model again
+        content = self.chat(messages, temperature=temperature, max_tokens=max_tokens,
+                            response_format=response_format)
+        value = parse(content)
+        if cache:
+            cache.set(key, content)  # Only valid responses are cached
+        return value
 
 class OpenAIClient(ModelClient):
     """Client for OpenAI models"""
     def __init__(self, api_key: str = None, model_name: str = "gpt-4o", 
-                 temperature: float = 0.7, max_tokens: Optional[int] = None):
-        super().__init__(model_name=model_name, temperature=temperature, max_tokens=max_tokens)
-        self.client = openai.OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+                 temperature: float = 0.7, max_tokens: Optional[int] = None,
+                 request_timeout: float = 60.0, pool_size: int = DEFAULT_POOL_SIZE):
+        super().__init__(model_name=model_name, temperature=temperature, max_tokens=max_tokens,
+                         request_timeout=request_timeout)
+        self.client = get_openai_client(api_key, request_timeout, pool_size)
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        self.pool_size = pool_size
+        self._async_clients = weakref.WeakKeyDictionary()  # One AsyncOpenAI per event loop
+
+    def _async_client(self) -> "openai.AsyncOpenAI":
+        # httpx async pools are bound to the loop that created them
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                timeout=self.request_timeout
+            )
+            client = openai.AsyncOpenAI(api_key=self.api_key, timeout=self.request_timeout,
+                                        http_client=http_client, max_retries=0)
+            self._async_clients[loop] = client
+        return client
     
-    def chat_completion(self, system_prompt: str, user_prompt: str, 
-                       temperature: Optional[float] = None, 
-                       max_tokens: Optional[int] = None) -> str:
+    def chat(self, messages: List[Dict[str, str]], 
+             temperature: Optional[float] = None, 
+             max_tokens: Optional[int] = None,
+             response_format: Optional[Dict[str, Any]] = None) -> str:
         # Use provided parameters or fall back to instance defaults
         temp = temperature if temperature is not None else self.temperature
         tokens = max_tokens if max_tokens is not None else self.max_tokens
         
-        response = self.client.chat.completions.create(
+        extra = {"response_format": response_format} if response_format else {}
+        response = self._call_with_retry(lambda: self.client.chat.completions.create(
             model=self.model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=messages,
             temperature=temp,
-            max_tokens=tokens
-        )
+            max_tokens=tokens,
+            **extra
+        ), messages, tokens)
         return response.choices[0].message.content
+
+    async def achat(self, messages: List[Dict[str, str]], 
+                    temperature: Optional[float] = None, 
+                    max_tokens: Optional[int] = None,
+                    response_format: Optional[Dict[str, Any]] = None) -> str:
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+
+        client = self._async_client()
+        extra = {"response_format": response_format} if response_format else {}
+        response = await self._acall_with_retry(lambda: client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            temperature=temp,
+            max_tokens=tokens,
+            **extra
+        ), messages, tokens)
+        return response.choices[0].message.content
+
+    def submit_batch(self, prompts: List[BatchPrompt],
+                     temperature: Optional[float] = None,
+                     max_tokens: Optional[int] = None) -> str:
+        """Upload prompts to the OpenAI Batch API and return the batch id."""
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+
+        lines = [json.dumps({
+            "custom_id": str(index),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {"model": self.model_name, "messages": self._batch_messages(prompt),
+                     "temperature": temp, "max_tokens": tokens}
+        }) for index, prompt in enumerate(prompts)]
+        batch_file = self.client.files.create(
+            file=("batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(input_file_id=batch_file.id, endpoint="/v1/chat/completions",
+                                           completion_window="24h")
+        print(f"📤 Submitted offline batch {batch.id} with {len(prompts)} prompts")
+        return batch.id
+
+    def collect_batch(self, batch_id: str, count: int, poll_interval: float = 30.0) -> List[BatchResult]:
+        """Wait for an offline batch and return its results in submission order."""
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in ("completed", "failed", "expired", "cancelled"):
+                break
+            time.sleep(poll_interval)
+
+        results = [BatchResult(error=f"Batch {batch.status} without a result for this prompt")] * count
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                index = int(record["custom_id"])
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    results[index] = BatchResult(error=json.dumps(record.get("error") or response.get("body")))
+                else:
+                    results[index] = BatchResult(content=response["body"]["choices"][0]["message"]["content"])
+                    self._record_usage(response["body"].get("usage"), time.perf_counter(), [])
+        return results
+
+    def offline_batch_completion(self, prompts: List[BatchPrompt],
+                                 temperature: Optional[float] = None,
+                                 max_tokens: Optional[int] = None,
+                                 poll_interval: float = 30.0) -> List[BatchResult]:
+        batch_id = self.submit_batch(prompts, temperature, max_tokens)
+        return self.collect_batch(batch_id, len(prompts), poll_interval)
+
+    def stream_chat(self, messages: List[Dict[str, str]], 
+                    temperature: Optional[float] = None, 
+                    max_tokens: Optional[int] = None,
+                    stop: Optional[List[str]] = None) -> Iterator[str]:
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+
+        extra = {"stop": stop} if stop else {}
+        started = time.perf_counter()
+        stream = self._call_with_retry(lambda: self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            temperature=temp,
+            max_tokens=tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+            **extra
+        ), messages, tokens)
+        text, usage = "", None
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage  # Sent with the last chunk
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text += chunk.choices[0].delta.content
+                    yield chunk.choices[0].delta.content
+        finally:
+            self._record_usage(usage, started, messages, text)
+            stream.close()  # Stops generation (and billing) if the caller stopped early
         
 
 class LiteLLMClient(ModelClient):
     """Client for LiteLLM which supports multiple providers"""
     def __init__(self, api_key: str = None, model_name: str = "gpt-4", 
                  litellm_provider: str = None, temperature: float = 0.7, 
-                 max_tokens: Optional[int] = None):
-        super().__init__(model_name=model_name, temperature=temperature, max_tokens=max_tokens)
+                 max_tokens: Optional[int] = None, request_timeout: float = 60.0):
+        super().__init__(model_name=model_name, temperature=temperature, max_tokens=max_tokens,
+                         request_timeout=request_timeout)
         self.api_key = api_key
         self.litellm_provider = litellm_provider
         
@@ -66,30 +475,79 @@ class LiteLLMClient(ModelClient):
             os.environ["OPENROUTER_API_KEY"] = self.api_key or os.environ.get("OPENROUTER_API_KEY", "")
         # Add other providers as needed
     
-    def chat_completion(self, system_prompt: str, user_prompt: str, 
-                       temperature: Optional[float] = None, 
-                       max_tokens: Optional[int] = None) -> str:
+    def chat(self, messages: List[Dict[str, str]], 
+             temperature: Optional[float] = None, 
+             max_tokens: Optional[int] = None,
+             response_format: Optional[Dict[str, Any]] = None) -> str:
         # Use provided parameters or fall back to instance defaults
         temp = temperature if temperature is not None else self.temperature
         tokens = max_tokens if max_tokens is not None else self.max_tokens
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
         # If a specific provider is defined, use it
         model_param = f"{self.litellm_provider}/{self.model_name}"
         
-        response = litellm.completion(
+        extra = {"response_format": response_format} if response_format else {}
+        response = self._call_with_retry(lambda: litellm.completion(
             model=model_param,
             messages=messages,
             temperature=temp,
-            max_tokens=tokens
-        )
+            max_tokens=tokens,
+            timeout=self.request_timeout,
+            **extra
+        ), messages, tokens)
         
         return response.choices[0].message.content
 
+    async def achat(self, messages: List[Dict[str, str]], 
+                    temperature: Optional[float] = None, 
+                    max_tokens: Optional[int] = None,
+                    response_format: Optional[Dict[str, Any]] = None) -> str:
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+
+        extra = {"response_format": response_format} if response_format else {}
+        response = await self._acall_with_retry(lambda: litellm.acompletion(
+            model=f"{self.litellm_provider}/{self.model_name}",
+            messages=messages,
+            temperature=temp,
+            max_tokens=tokens,
+            timeout=self.request_timeout,
+            **extra
+        ), messages, tokens)
+        return response.choices[0].message.content
+
+    def stream_chat(self, messages: List[Dict[str, str]], 
+                    temperature: Optional[float] = None, 
+                    max_tokens: Optional[int] = None,
+                    stop: Optional[List[str]] = None) -> Iterator[str]:
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+
+        extra = {"stop": stop} if stop else {}
+        started = time.perf_counter()
+        stream = self._call_with_retry(lambda: litellm.completion(
+            model=f"{self.litellm_provider}/{self.model_name}",
+            messages=messages,
+            temperature=temp,
+            max_tokens=tokens,
+            timeout=self.request_timeout,
+            stream=True,
+            stream_options={"include_usage": True},
+            **extra
+        ), messages, tokens)
+        text, usage = "", None
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage  # Sent with the last chunk
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text += chunk.choices[0].delta.content
+                    yield chunk.choices[0].delta.content
+        finally:
+            self._record_usage(usage, started, messages, text)
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
 class ModelConfig:
     """Configuration class for a LLM model"""
     def __init__(
@@ -99,7 +557,9 @@ class ModelConfig:
         api_key: str = None,
         litellm_provider: str = None,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        request_timeout: float = 60.0,
+        pool_size: int = DEFAULT_POOL_SIZE
     ):
         self.provider = provider.lower()
         self.model_name = model_name
@@ -107,6 +567,8 @@ class ModelConfig:
         self.litellm_provider = litellm_provider
         self.temperature = temperature
         self.max_tokens = max_tokens or 2048  # Default max_tokens
+        self.request_timeout = request_timeout
+        self.pool_size = pool_size
         
         # Set defaults based on provider
         if not self.model_name:
@@ -122,7 +584,9 @@ class ModelConfig:
                 api_key=self.api_key, 
                 model_name=self.model_name,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                request_timeout=self.request_timeout,
+                pool_size=self.pool_size
             )
         elif self.provider == "litellm":
             return LiteLLMClient(
@@ -130,7 +594,8 @@ class ModelConfig:
                 model_name=self.model_name, 
                 litellm_provider=self.litellm_provider,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                request_timeout=self.request_timeout
             )
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
@@ -141,7 +606,9 @@ def create_model(
     api_key: str = None,
     litellm_provider: str = None,
     temperature: float = 0.7,
-    max_tokens: Optional[int] = None
+    max_tokens: Optional[int] = None,
+    request_timeout: float = 60.0,
+    pool_size: int = DEFAULT_POOL_SIZE
 ) -> ModelClient:
     """
     Create and return a model client with the specified configuration
@@ -153,6 +620,8 @@ def create_model(
         litellm_provider: For litellm, the specific provider to use
         temperature: The temperature parameter for the model (default: 0.7)
         max_tokens: The maximum tokens for the model (default: 2048)
+        request_timeout: Seconds before a single API call times out (default: 60)
+        pool_size: Keep-alive connections in the shared HTTP pool (default: 20)
         
     Returns:
         ModelClient: A configured model client
@@ -163,6 +632,153 @@ def create_model(
         api_key=api_key,
         litellm_provider=litellm_provider,
         temperature=temperature,
-        max_tokens=max_tokens
+        max_tokens=max_tokens,
+        request_timeout=request_timeout,
+        pool_size=pool_size
     )
-    return config.create_client()
\ No newline at end of file
+    return config.create_client()
+
+def get_shared_model(**kwargs: Any) -> ModelClient:
+    """
+    Like create_model, but returns the same (thread-safe) client for the same
+    configuration, so tools and agents can share one instead of building their own.
+    """
+    key = tuple(sorted((name, str(value)) for name, value in kwargs.items()))
+    with _registry_lock:
+        client = _shared_models.get(key)
+        if client is None:
+            client = create_model(**kwargs)
+            _shared_models[key] = client
+        return client
+
+# Model per tier, weakest first: failed validations escalate along this order
+DEFAULT_MODEL_TIERS = {"fast": "gpt-4o-mini", "strong": "gpt-4o"}
+
+# Tier per task class; unknown tasks use the strongest tier
+DEFAULT_TASK_TIERS = {
+    "extract": "fast",     # Pull structured fields out of text (user intent, ...)
+    "classify": "fast",    # Short lists / yes-no decisions (venue types, sightseeing, ...)
+    "summarize": "fast",   # Condense agent output for the final plan
+    "creative": "strong",  # Schedules, themes and other open-ended planning
+}
+
+class ModelRouter:
+    """
+    Routes each call to a model tier by task class, and escalates to the
+    next stronger tier only when the response fails to parse or validate.
+
+    Tiers and task mapping come from the constructor or the JSON env vars
+    AGENTPRO_MODEL_TIERS / AGENTPRO_TASK_TIERS. Per-tier latency, cost,
+    failure and escalation counts are available from `stats()`.
+    """
+    def __init__(self, tiers: Optional[Dict[str, str]] = None, task_tiers: Optional[Dict[str, str]] = None,
+                 provider: str = "openai", api_key: Optional[str] = None):
+        self.tiers = tiers or {**DEFAULT_MODEL_TIERS, **json.loads(os.environ.get("AGENTPRO_MODEL_TIERS", "{}"))}
+        self.task_tiers = task_tiers or {**DEFAULT_TASK_TIERS, **json.loads(os.environ.get("AGENTPRO_TASK_TIERS", "{}"))}
+        self.provider = provider
+        self.api_key = api_key
+        self._clients: Dict[str, ModelClient] = {}
+        self._usage = {tier: UsageTotals(breakdown_tag="task") for tier in self.tiers}
+        self._counts = {tier: {"attempts": 0, "failures": 0, "escalations": 0} for tier in self.tiers}
+        self._lock = threading.Lock()
+
+    def client(self, tier: str) -> ModelClient:
+        """Shared client for a tier."""
+        with self._lock:
+            if tier not in self._clients:
+                self._clients[tier] = get_shared_model(provider=self.provider, model_name=self.tiers[tier],
+                                                       api_key=self.api_key)
+            return self._clients[tier]
+
+    def tier_for(self, task: str) -> str:
+        return self.task_tiers.get(task, list(self.tiers)[-1])
+
+    def client_for(self, task: str) -> ModelClient:
+        """Client for a task's tier, for calls that need no validation (e.g. batches)."""
+        return self.client(self.tier_for(task))
+
+    def _escalation_path(self, task: str) -> List[str]:
+        order = list(self.tiers)
+        return order[order.index(self.tier_for(task)):]
+
+    def _attempt(self, task: str, call: Callable[[ModelClient], Any]) -> Any:
+        # `call` raises ValueError when the response fails to parse or validate
+        path = self._escalation_path(task)
+        for i, tier in enumerate(path):
+            with usage_tags(task=task, tier=tier), track_usage(breakdown_tag="task") as usage:
+                try:
+                    result = call(self.client(tier))
+                    error = None
+                except ValueError as e:
+                    error = str(e)
+            self._usage[tier].add(usage.prompt_tokens, usage.completion_tokens, usage.seconds, usage.cost,
+                                  tags={"task": task}, calls=usage.calls)
+            last = i == len(path) - 1
+            with self._lock:
+                counts = self._counts[tier]
+                counts["attempts"] += 1
+                counts["failures"] += error is not None
+                counts["escalations"] += error is not None and not last
+            if error is None:
+                return result
+            if last:
+                raise ValueError(f"❌ {task} failed on every tier ({', '.join(path)}): {error}")
+            print(f"⬆️ {task} on {self.tiers[tier]} failed ({error[:80]}), escalating to {self.tiers[path[i + 1]]}")
+
+    def structured_completion(self, task: str, system_prompt: str, user_prompt: str,
+                              schema: Optional[Dict[str, Any]] = None,
+                              validate: Optional[Callable[[Any], bool]] = None,
+                              cache: Optional[ResponseCache] = None, **kwargs: Any) -> Any:
+        """
+        ModelClient.structured_completion on the task's tier, escalating on
+        parse/validation failure. `validate` runs in the client, before the
+        response is cached.
+        """
+        return self._attempt(task, lambda client: client.structured_completion(
+            system_prompt, user_prompt, schema=schema, cache=cache, validate=validate, **kwargs))
+
+    def structured_list(self, task: str, user_prompt: str, system_prompt: str = JSON_ONLY_SYSTEM_PROMPT,
+                        cache: Optional[ResponseCache] = None) -> List[str]:
+        """
+        Non-empty list of strings for a deterministic lookup (e.g. the venue
+        types for an event type): run at temperature 0 and cached on disk
+        (the shared response cache unless `cache` is given), escalating only
+        if the list comes back empty or malformed.
+        """
+        return self.structured_completion(
+            task, system_prompt, user_prompt, schema=STRING_LIST_SCHEMA, temperature=0,
+            cache=cache or get_response_cache(),
+            validate=lambda items: bool(items) and all(isinstance(item, str) for item in items))
+
+    def chat_completion(self, task: str, system_prompt: str, user_prompt: str,
+                        validate: Optional[Callable[[str], bool]] = None, **kwargs: Any) -> str:
+        """ModelClient.chat_completion on the task's tier, escalating when `validate` rejects the text."""
+        return self._attempt(task, lambda client: client.chat_completion(
+            system_prompt, user_prompt, validate=validate, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        """Per tier: model, usage (overall and by task), failures and escalations."""
+        with self._lock:
+            counts = {tier: dict(c) for tier, c in self._counts.items()}
+        result = {}
+        for tier, model_name in self.tiers.items():
+            attempts = counts[tier]["attempts"]
+            usage = self._usage[tier].as_dict()
+            result[tier] = {
+                "model": model_name,
+                **counts[tier],
+                "failure_rate": round(counts[tier]["failures"] / attempts, 3) if attempts else 0.0,
+                "avg_seconds": round(usage["seconds"] / attempts, 3) if attempts else 0.0,
+                **usage,
+            }
+        return result
+
+_router: Optional[ModelRouter] = None
+
+def get_router() -> ModelRouter:
+    """Process-wide router with the default (or env-configured) tiers."""
+    global _router
+    with _registry_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
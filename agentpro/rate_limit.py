@@ -0,0 +1,142 @@
+# rate_limit.py
+from typing import Any, Dict, List, Optional
+import asyncio
+import os
+import random
+import threading
+import time
+
+# Account limits shared by every client of a model (override per deployment)
+DEFAULT_REQUESTS_PER_MINUTE = int(os.environ.get("AGENTPRO_RPM", "500"))
+DEFAULT_TOKENS_PER_MINUTE = int(os.environ.get("AGENTPRO_TPM", "30000"))
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+class TokenBucketLimiter:
+    """
+    Token-bucket limiter for requests/min and tokens/min.
+
+    Callers reserve capacity before each API call and wait (in a thread or
+    in asyncio) until both buckets allow it. Thread-safe and usable from
+    several event loops, so one limiter can front every agent and plan.
+    """
+    def __init__(self, requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._metrics = {"requests": 0, "queued": 0, "queue_seconds": 0.0, "max_queue_seconds": 0.0, "retries": 0}
+
+    def _reserve(self, tokens: int) -> float:
+        """Take capacity if available and return 0, else return seconds to wait."""
+        tokens = min(tokens, self.tokens_per_minute)  # A single huge request must still fit eventually
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+            if self._requests >= 1 and self._tokens >= tokens:
+                self._requests -= 1
+                self._tokens -= tokens
+                return 0.0
+            wait_requests = max(0.0, 1 - self._requests) * 60 / self.requests_per_minute
+            wait_tokens = max(0.0, tokens - self._tokens) * 60 / self.tokens_per_minute
+            return max(wait_requests, wait_tokens, 0.01)
+
+    def _record(self, waited: float, queued: bool):
+        with self._lock:
+            self._metrics["requests"] += 1
+            if queued:
+                self._metrics["queued"] += 1
+                self._metrics["queue_seconds"] += waited
+                self._metrics["max_queue_seconds"] = max(self._metrics["max_queue_seconds"], waited)
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until the request fits; returns the time spent queued."""
+        started, queued = time.monotonic(), False
+        while True:
+            delay = self._reserve(tokens)
+            if not delay:
+                break
+            queued = True
+            time.sleep(delay)
+        waited = time.monotonic() - started if queued else 0.0
+        self._record(waited, queued)
+        return waited
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """Async version of acquire that yields to the event loop while queued."""
+        started, queued = time.monotonic(), False
+        while True:
+            delay = self._reserve(tokens)
+            if not delay:
+                break
+            queued = True
+            await asyncio.sleep(delay)
+        waited = time.monotonic() - started if queued else 0.0
+        self._record(waited, queued)
+        return waited
+
+    def record_retry(self):
+        with self._lock:
+            self._metrics["retries"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["queue_seconds"] = round(metrics["queue_seconds"], 3)
+        metrics["max_queue_seconds"] = round(metrics["max_queue_seconds"], 3)
+        metrics["avg_queue_seconds"] = round(metrics["queue_seconds"] / metrics["requests"], 3) if metrics["requests"] else 0.0
+        return metrics
+
+_limiters: Dict[str, TokenBucketLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(model_name: str) -> TokenBucketLimiter:
+    """Process-wide limiter per model, since provider limits are per model."""
+    with _limiters_lock:
+        if model_name not in _limiters:
+            _limiters[model_name] = TokenBucketLimiter()
+        return _limiters[model_name]
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """Rough token cost of a request (~4 characters per token plus the completion budget)."""
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // 4 + max_tokens
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections are worth retrying."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    name = type(error).__name__
+    return any(kind in name for kind in ("RateLimit", "Timeout", "Connection", "ServiceUnavailable", "InternalServer"))
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait (Retry-After / retry-after-ms headers), if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass  # HTTP-date form is not worth parsing; fall back to backoff
+    return None
+
+def backoff_delay(attempt: int, error: Exception, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter, never shorter than the provider's Retry-After."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    hinted = retry_after(error)
+    return max(delay, hinted) if hinted is not None else delay
@@ -1,22 +1,44 @@
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import functools
 import requests
 import json
 import openai
 from .tools import Tool
 from .agent import Action, Observation, ThoughtStep, AgentResponse
 from .model import ModelClient, create_model
+from .cache import ResponseCache
+from .usage import track_usage
 
 import re
 from datetime import datetime
 
+# Appended after the question and after every observation
+CONTINUE_PROMPT = "Now continue with next steps by strictly following the required format."
 
+# The model must never write its own observations; stop generation if it tries
+STOP_SEQUENCES = ["Observation:"]
+
+def with_usage(method):
+    """Attach the tokens, wall time and cost of every model call made by `method` to its AgentResponse."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs) -> AgentResponse:
+        with track_usage() as usage:
+            response = method(*args, **kwargs)
+        response.usage = usage.as_dict()
+        return response
+    return wrapper
 
 class ReactAgent:
-    def __init__(self, model: Optional[ModelClient] = None, tools: List[Tool] = None, custom_system_prompt: str = None, max_iterations: int = 20):
+    def __init__(self, model: Optional[ModelClient] = None, tools: List[Tool] = None, custom_system_prompt: str = None, max_iterations: int = 20,
+                 max_parallel_actions: int = 4, stream: bool = True):
 
         self.client = model or create_model(provider="openai")
 
         self.max_iterations = max_iterations
+        self.max_parallel_actions = max_parallel_actions  # Independent actions run concurrently in one step
+        self.stream = stream  # Stream each step so generation can stop as soon as it is complete
 
         # Get Tool Details
         self.tools = tools or []
@@ -55,32 +77,64 @@ Option 1 — When action is needed:
 Thought: Your reasoning about action and observation.
 Action: {{"action_type": "<action_type>", "input": <input_data>}}
 
+If several independent actions are needed (e.g. searches that do not depend on each other), send them together as a list:
+Action: [{{"action_type": "<action_type>", "input": <input_data>}}, {{"action_type": "<action_type>", "input": <input_data>}}]
+
 Option 2 — When you're confident in the final response:
 Thought: Now I know the answer that will be given in Final Answer.
 Final Answer: Provide a complete, well-structured response that directly addresses the original question.
 
 ### Important:
 - Think step-by-step.
-- Never provide both Action and Final Answer or multiple Action in the same response.
+- Never provide both Action and Final Answer or more than one Action line in the same response; put independent actions in one Action list instead.
 - Use available tools wisely.
 - If stuck, reflect and retry but never hallucinate.
 - If observation is empty or not related, reflect and retry but never hallucinate.
 - The current date is {current_date}.
 - If you follow the format strictly, you will be recognized as an excellent and trustworthy AI assistant.
 """
+        # Short system prompt for the tool-less structured fast path (see run_structured)
+        self.structured_system_prompt = (
+            f"{user_system_prompt}\nRespond with valid JSON only. The current date is {current_date}."
+        )
+
+    @staticmethod
+    def _parse_actions(step_text: str) -> Tuple[List[Action], Optional[str]]:
+        """
+        Parse the JSON following `Action:`: either a single action object or a
+        list of independent actions. Returns the actions and their JSON text.
+        """
+        marker = step_text.find("Action:")
+        if marker == -1:
+            return [], None
+
+        start = marker + len("Action:")
+        while start < len(step_text) and step_text[start].isspace():
+            start += 1
+        data, end = json.JSONDecoder().raw_decode(step_text, start)
+
+        items = data if isinstance(data, list) else [data]
+        actions = [Action(action_type=item["action_type"], input=item["input"]) for item in items]
+        return actions, step_text[start:end]
+
+    @staticmethod
+    def _format_observations(actions: List[Action], observations: List[Observation]) -> str:
+        if len(observations) == 1:
+            return f"Observation: {observations[0].result}"
+        return "\n".join(
+            f"Observation {i} ({action.action_type}): {observation.result}"
+            for i, (action, observation) in enumerate(zip(actions, observations), start=1)
+        )
 
-    def _format_history(self, thought_process: List[ThoughtStep]) -> str:
-        history = ""
-        for step in thought_process:
-            if step.pause_reflection:
-                history += f"PAUSE: {step.pause_reflection}\n"
-            if step.thought:
-                history += f"Thought: {step.thought}\n"
-            if step.action:
-                history += f"Action: {step.action.model_dump_json()}\n"
-            if step.observation:
-                history += f"Observation: {step.observation.result}\n"
-        return history
+    def execute_tools(self, actions: List[Action]) -> List[str]:
+        """Run independent actions concurrently; results keep the order of `actions`."""
+        if len(actions) == 1:
+            return [self.execute_tool(actions[0])]
+        workers = min(len(actions), self.max_parallel_actions)
+        # Each action runs in a copy of the caller's context so usage tags follow it
+        contexts = [contextvars.copy_context() for _ in actions]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="react-action") as pool:
+            return list(pool.map(lambda ctx, action: ctx.run(self.execute_tool, action), contexts, actions))
 
     def execute_tool(self, action: Action) -> str:
         tool = self.tool_registry.get(action.action_type)
@@ -92,20 +146,102 @@ Final Answer: Provide a complete, well-structured response that directly address
         except Exception as e:
             return f"Error running tool '{action.action_type}': {e}"
 
-    def _get_llm_response(self, prompt: str) -> str:
+    def _get_llm_response(self, messages: List[Dict[str, str]],
+                          on_token: Optional[Callable[[str], None]] = None) -> str:
         if not self.client:
             raise ValueError("❌ LLM client not initialized")
         
-        return self.client.chat_completion(
-            system_prompt=self.system_prompt,
-            user_prompt=prompt,
-            )
-
-    def run(self, query: str) -> AgentResponse:
+        if not self.stream:
+            return self.client.chat(messages)
+        return self._stream_llm_response(messages, on_token)
+
+    def _stream_llm_response(self, messages: List[Dict[str, str]],
+                             on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Stream one step and stop generating as soon as it is complete: right
+        after a full Action JSON, or before a hallucinated Observation. Text
+        after `Final Answer:` is forwarded to `on_token` as it arrives.
+        """
+        text = ""
+        forwarded = 0  # Characters of the final answer already sent to on_token
+        stream = self.client.stream_chat(messages, stop=STOP_SEQUENCES)
+        try:
+            for chunk in stream:
+                text += chunk
+
+                observation_at = text.find("Observation:")
+                if observation_at != -1:
+                    text = text[:observation_at]
+                    break
+
+                if "Action:" in text:
+                    if "}" not in chunk and "]" not in chunk:
+                        continue
+                    try:
+                        actions, action_text = self._parse_actions(text)
+                    except Exception:
+                        continue  # Action JSON not complete yet
+                    if actions:
+                        text = text[:text.index(action_text) + len(action_text)]
+                        print("✂️ [Debug] Complete Action received, stopping generation early")
+                        break
+                elif on_token and "Final Answer:" in text:
+                    answer = text[text.index("Final Answer:") + len("Final Answer:"):].lstrip()
+                    if len(answer) > forwarded:
+                        on_token(answer[forwarded:])
+                        forwarded = len(answer)
+        finally:
+            stream.close()
+        return text
+
+    @with_usage
+    def run_structured(self, query: str, schema: Optional[Dict[str, Any]] = None,
+                       cache: Optional[ResponseCache] = None) -> AgentResponse:
+        """
+        Answer with a single JSON completion when no tools are registered.
+
+        Skips the ReAct scaffold and uses the model's JSON response mode
+        (constrained to `schema` if given); `final_answer` holds the JSON
+        text. Agents with tools, or a response that still fails to parse,
+        fall back to the normal `run` loop. Pass a ResponseCache to reuse
+        answers to identical deterministic prompts.
+        """
+        if self.tools or not self.client:
+            return self.run(query)
+
+        print("⚡ [Debug] Structured single-shot request (no tools registered)")
+        try:
+            data = self.client.structured_completion(self.structured_system_prompt, query, schema=schema,
+                                                     cache=cache)
+        except ValueError as e:
+            print(f"❌ Structured response failed, falling back to ReAct loop: {e}")
+            return self.run(query)
+
+        final_answer = json.dumps(data, ensure_ascii=False)
+        print("✅ Parsed Final Answer:", final_answer)
+        return AgentResponse(thought_process=[], final_answer=final_answer)
+
+    @with_usage
+    def run(self, query: str, on_token: Optional[Callable[[str], None]] = None) -> AgentResponse:
+        """
+        Run the ReAct loop until a Final Answer (or max_iterations).
+        `on_token` receives the final answer text incrementally while it is
+        being generated, e.g. to stream it into a UI.
+        """
         thought_process: List[ThoughtStep] = []
-        printed_prompt = False  # <<< ADD A FLAG
         iterations_count = 0
-        
+
+        # Append-only conversation: the system prompt is sent once as the first
+        # message and every step is serialized exactly once, so the prefix stays
+        # stable between iterations (and can be cached by the provider).
+        messages: List[Dict[str, str]] = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": f"Question: {query}\n\n{CONTINUE_PROMPT}"},
+        ]
+        print("✅  [Debug] Sending System Prompt and Question to LLM:")
+        print(self.system_prompt)
+        print(messages[1]["content"])
+        print("=" * 50)
 
         while iterations_count < self.max_iterations:
             iterations_count += 1
@@ -117,22 +253,9 @@ Final Answer: Provide a complete, well-structured response that directly address
             observation = None
             pause_reflection = None
 
-            # Get the System Prompt with History (Whole thought process)
-            prompt = f"{self.system_prompt}\n\nQuestion: {query}\n\n"
-            if thought_process:
-                prompt += self._format_history(thought_process)
-            prompt += "\nNow continue with next steps by strictly following the required format.\n"
-
-            # Print whole System Prompt once in the start
-            if not printed_prompt:
-                print("✅  [Debug] Sending System Prompt (with history) to LLM:")
-                print(prompt)
-                print("=" * 50)
-                printed_prompt = True  # <<< Set flag True after printing
-
             # Run LLM model
             if self.client:
-                step_text = self._get_llm_response(prompt)
+                step_text = self._get_llm_response(messages, on_token)
             else:
                 return AgentResponse(
                     thought_process=thought_process,
@@ -176,54 +299,67 @@ Final Answer: Provide a complete, well-structured response that directly address
                 try:
                     # Try Extracting Thought Action and Pause
                     thought_match = re.search(r"Thought:\s*(.*?)(?:Action:|PAUSE:|Final Answer:|$)", step_text, re.DOTALL)
-                    action_match = re.search(r"Action:\s*(\{.*?\})(?:Observation:|PAUSE:|Thought:|Final Answer:|$)", step_text, re.DOTALL)
                     pause_match = re.search(r"PAUSE:\s*(.*?)(?:Thought:|Action:|Final Answer:|$)", step_text, re.DOTALL)
 
+                    # Serialized once: this is exactly what goes back into the conversation
+                    step_lines = []
+
+                    # Extract PAUSE if found
+                    if pause_match:
+                        pause_reflection = pause_match.group(1).strip()
+                        print("✅ Parsed Pause Reflection:", pause_reflection)
+                        step_lines.append(f"PAUSE: {pause_reflection}")
+
                     # Extract Thought if found
                     if thought_match:
                         thought = thought_match.group(1).strip()
                         print("✅ Parsed Thought:", thought)
+                        step_lines.append(f"Thought: {thought}")
 
-                    # Extract Action if found
-                    if action_match:
-                        action_text = action_match.group(1).strip()
+                    # Extract Action(s) if found: one object or a list of independent actions
+                    actions, action_text = self._parse_actions(step_text)
+                    observations = []
+                    if actions:
                         print("✅ Parsed Action JSON:", action_text)
+                        step_lines.append(f"Action: {action_text}")
+
+                        # Execute actions (concurrently when there are several)
+                        results = self.execute_tools(actions)
+                        for action, result in zip(actions, results):
+                            print(f"✅ Parsed Action Results ({action.action_type}):", result)
+                        observations = [Observation(result=result) for result in results]
+
+                    # Record the thought step (one per action; the thought goes with the first)
+                    for i, (action, observation) in enumerate(zip(actions, observations)):
+                        thought_process.append(ThoughtStep(
+                            thought=thought if i == 0 else None,
+                            action=action,
+                            observation=observation,
+                            pause_reflection=pause_reflection if i == 0 else None
+                        ))
+                    if not actions:
+                        thought_process.append(ThoughtStep(
+                            thought=thought,
+                            pause_reflection=pause_reflection
+                        ))
 
-                        # Load action safely
-                        action_data = json.loads(action_text)
-                        action = Action(
-                            action_type=action_data["action_type"],
-                            input=action_data["input"]
-                        )
-
-                        # Execute action
-                        result = self.execute_tool(action)
-                        print("✅ Parsed Action Results:", result)
-                        observation = Observation(result=result)
-
-                    # Extract PAUSE if found
-                    if pause_match:
-                        pause_reflection = pause_match.group(1).strip()
-                        print("✅ Parsed Pause Reflection:", pause_reflection)
-
-                    # Record the thought step
-                    thought_process.append(ThoughtStep(
-                        thought=thought,
-                        action=action,
-                        observation=observation,
-                        pause_reflection=pause_reflection
-                    ))
+                    messages.append({"role": "assistant", "content": "\n".join(step_lines) or step_text})
+                    if observations:
+                        messages.append({"role": "user", "content": f"{self._format_observations(actions, observations)}\n\n{CONTINUE_PROMPT}"})
+                    else:
+                        messages.append({"role": "user", "content": CONTINUE_PROMPT})
                 except Exception as e:
                     print(f"❌ Error parsing LLM response: {e}")
                     print(f"❌ Raw step text: {step_text}")
                     
                     error_message = (
                         f"Error parsing LLM response: {e}\n"
-                        f"Response: {step_text}\n\n"
+                        "The response above could not be parsed.\n\n"
                         "### Response format (choose only one per response)\n\n"
                         "Option 1 — When action is needed:\n"
                         "Thought: Your reasoning about action\n"
-                        "Action: {\"action_type\": \"<action_type>\", \"input\": <input_data>}\n\n"
+                        "Action: {\"action_type\": \"<action_type>\", \"input\": <input_data>}\n"
+                        "(or a JSON list of such objects for independent actions)\n\n"
                         "Option 2 — When you're confident in the final response:\n"
                         "Thought: Now I know the answer that will be given in Final Answer.\n"
                         "Final Answer: Provide a complete, well-structured response that directly addresses the original question."
@@ -241,6 +377,8 @@ Final Answer: Provide a complete, well-structured response that directly address
                         observation=observation,
                         pause_reflection=None
                         ))
+                    messages.append({"role": "assistant", "content": step_text})
+                    messages.append({"role": "user", "content": f"Observation: {error_message}"})
                     # Continue to the next iteration instead of returning
         
         # # If exceeded max steps
@@ -6,7 +6,7 @@ from .ares_tool import AresInternetTool
 from .yfinance_tool import YFinanceTool
 from .traversaalpro_rag_tool import TraversaalProRAGTool
 from .slide_generation_tool import SlideGenerationTool
-from .meal_planner_tool import MealPlannerTool
+from .mealplanner_tool import MealPlannerTool
 __all__ = [
     "Tool",
     "QuickInternetTool",
@@ -1,8 +1,9 @@
-from openai import OpenAI
 import os
 import ast
 from agentpro.tools import Tool
-from typing import Any, Dict
+from agentpro.model import ModelClient, get_shared_model
+from pydantic import PrivateAttr
+from typing import Any, Dict, Optional
 
 class MealPlannerTool(Tool):
     name: str = "Meal Planner Tool"
@@ -14,8 +15,15 @@ class MealPlannerTool(Tool):
         "Dict with keys: 'event_type', 'location', and 'schedule'."
     )
 
+    _model: Optional[ModelClient] = PrivateAttr(default=None)
+
+    def __init__(self, model: Optional[ModelClient] = None, **data):
+        super().__init__(**data)
+        self._model = model  # Falls back to the shared gpt-4o client
+
     def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+        model = self._model or get_shared_model(provider="openai", model_name="gpt-4o",
+                                                api_key=os.environ["OPENAI_API_KEY"])
 
         event_type = input_data.get("event_type", "general event")
         location = input_data.get("location", "unknown location")
@@ -41,15 +49,7 @@ Ensure output is valid Python.
 IMPORTANT: Respond immediately with the final JSON object using only Final Answer: followed by the valid JSON.\n"
 """
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You plan meals for global events."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-
-        content = response.choices[0].message.content
+        content = model.chat_completion("You plan meals for global events.", prompt)
 
         try:
             meal_plan = ast.literal_eval(content.strip())
@@ -0,0 +1,152 @@
+# usage.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Tuple
+import threading
+
+# USD per 1M tokens (prompt, completion); unknown models are costed at 0
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4": (30.00, 60.00),
+}
+
+# Tags (e.g. agent, plan_id) attached to every call made in the current context.
+# Plan executor and pool threads copy the context, so tags follow the work.
+_tags: ContextVar[Dict[str, str]] = ContextVar("usage_tags", default={})
+_scopes: ContextVar[Tuple["UsageTotals", ...]] = ContextVar("usage_scopes", default=())
+
+def estimate_cost(model_name: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    name = (model_name or "").split("/")[-1]
+    # Dated snapshots (gpt-4o-2024-08-06) are priced like their base model
+    base = max((known for known in MODEL_PRICES if name.startswith(known)), key=len, default=None)
+    if base is None:
+        return 0.0
+    prompt_price, completion_price = MODEL_PRICES[base]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+@dataclass
+class UsageTotals:
+    """Thread-safe running totals, optionally broken down by one tag (e.g. agent)."""
+    breakdown_tag: Optional[str] = "agent"
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    seconds: float = 0.0
+    cost: float = 0.0
+    breakdown: Dict[str, "UsageTotals"] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, prompt_tokens: int, completion_tokens: int, seconds: float, cost: float,
+            tags: Optional[Dict[str, str]] = None, calls: int = 1):
+        with self._lock:
+            self.calls += calls
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.seconds += seconds
+            self.cost += cost
+            key = (tags or {}).get(self.breakdown_tag) if self.breakdown_tag else None
+            if key is not None:
+                self.breakdown.setdefault(key, UsageTotals(breakdown_tag=None))
+        if key is not None:
+            self.breakdown[key].add(prompt_tokens, completion_tokens, seconds, cost, calls=calls)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            result = {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+                "seconds": round(self.seconds, 3),
+                "cost_usd": round(self.cost, 6),
+            }
+            breakdown = dict(self.breakdown)
+        if breakdown:
+            result[f"by_{self.breakdown_tag}"] = {key: totals.as_dict() for key, totals in breakdown.items()}
+        return result
+
+class UsageTracker:
+    """
+    Process-wide usage metrics, aggregated per (model, tags) so memory grows
+    with the number of distinct tag combinations rather than calls; beyond
+    `max_entries` combinations the oldest are dropped.
+    """
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._totals: Dict[Tuple, UsageTotals] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_name: str, tags: Dict[str, str], prompt_tokens: int,
+               completion_tokens: int, seconds: float, cost: float):
+        key = (model_name, tuple(sorted(tags.items())))
+        with self._lock:
+            totals = self._totals.get(key)
+            if totals is None:
+                totals = self._totals[key] = UsageTotals(breakdown_tag=None)
+                while len(self._totals) > self.max_entries:
+                    del self._totals[next(iter(self._totals))]
+        totals.add(prompt_tokens, completion_tokens, seconds, cost)
+
+    def _matching(self, filters: Dict[str, str]):
+        with self._lock:
+            items = list(self._totals.items())
+        for (model_name, tags), totals in items:
+            tag_dict = dict(tags, model=model_name)
+            if all(tag_dict.get(name) == value for name, value in filters.items()):
+                yield tag_dict, totals
+
+    def totals(self, by: Optional[str] = None, **filters: str) -> Dict[str, Any]:
+        """
+        Totals for calls matching `filters` (e.g. plan_id="...", model="gpt-4o"),
+        optionally broken down by another tag: totals(by="agent").
+        """
+        combined = UsageTotals(breakdown_tag=by)
+        for tag_dict, totals in self._matching(filters):
+            with totals._lock:
+                numbers = (totals.prompt_tokens, totals.completion_tokens, totals.seconds, totals.cost)
+                calls = totals.calls
+            combined.add(*numbers, tags=tag_dict, calls=calls)
+        return combined.as_dict()
+
+    def clear(self, **filters: str):
+        """Drop metrics matching `filters` (all of them if none are given)."""
+        matching = {id(totals) for _, totals in self._matching(filters)}
+        with self._lock:
+            self._totals = {key: totals for key, totals in self._totals.items() if id(totals) not in matching}
+
+_tracker = UsageTracker()
+
+def get_usage_tracker() -> UsageTracker:
+    return _tracker
+
+@contextmanager
+def usage_tags(**tags: str) -> Iterator[None]:
+    """Tag every model call made inside this block (and threads it starts via copied contexts)."""
+    token = _tags.set({**_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+@contextmanager
+def track_usage(breakdown_tag: Optional[str] = "agent") -> Iterator[UsageTotals]:
+    """Collect the usage of every model call made inside this block."""
+    totals = UsageTotals(breakdown_tag=breakdown_tag)
+    token = _scopes.set(_scopes.get() + (totals,))
+    try:
+        yield totals
+    finally:
+        _scopes.reset(token)
+
+def record_usage(model_name: str, prompt_tokens: int, completion_tokens: int, seconds: float):
+    """Called by ModelClient after every API call."""
+    tags = _tags.get()
+    cost = estimate_cost(model_name, prompt_tokens, completion_tokens)
+    _tracker.record(model_name, tags, prompt_tokens, completion_tokens, seconds, cost)
+    for totals in _scopes.get():
+        totals.add(prompt_tokens, completion_tokens, seconds, cost, tags)
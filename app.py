@@ -1,5 +1,5 @@
 import streamlit as st
-from orchestrator import orchestrated_event_plan
+from orchestrator import build_event_plan, iter_event_plan, new_plan_id
 from user_intent_agent import extract_user_intent  # ✅ Change if path differs
 
 st.set_page_config(page_title="AI Event Manager", page_icon="🎉")
@@ -10,16 +10,40 @@ user_query = st.text_area("📝 Describe your event",
     placeholder="e.g. Plan a wedding in Islamabad on June 13 with 300 guests")
 
 if st.button("🧠 Plan Event"):
-    with st.spinner("Processing..."):
-        try:
+    try:
+        with st.spinner("Extracting intent..."):
             user_intent = extract_user_intent(user_query)
-            st.subheader("🎯 Extracted Intent")
-            st.json(user_intent)
+        st.subheader("🎯 Extracted Intent")
+        st.json(user_intent)
 
-            plan = orchestrated_event_plan(user_intent)
-            st.subheader("🧩 Event Plan Summary")
-            for section, content in plan["summary"].items():
-                st.markdown(f"### 🔹 {section.capitalize()}")
-                st.json(content)
-        except Exception as e:
-            st.error(f"❌ Error: {e}")
+        # 🔁 Render each section as soon as its agent finishes; sections not
+        # affected by edits since the last plan in this session are reused
+        st.subheader("📦 Agent Results")
+        results = {}
+        plan_id = new_plan_id()
+        with st.status("Planning event...", expanded=True) as status:
+            for result in iter_event_plan(user_intent, previous_plan=st.session_state.get("plan"),
+                                          plan_id=plan_id):
+                results[result.name] = result
+                if result.name == "summary":
+                    continue
+                title = result.name.replace('_', ' ').title()
+                if result.degraded:
+                    st.warning(f"⚠️ {title} unavailable: {result.error}")
+                    continue
+                note = "reused" if result.reused else f"{result.duration:.1f}s"
+                st.markdown(f"### 🔹 {title} ({note})")
+                st.json(result.value, expanded=False)
+            status.update(label="Event plan ready!", state="complete", expanded=False)
+
+        plan = build_event_plan(user_intent, results, plan_id)
+        st.session_state["plan"] = plan
+        usage = plan["usage"]
+        st.caption(f"💰 {usage['total_tokens']} tokens in {usage['calls']} model calls (~${usage['cost_usd']:.4f})")
+
+        st.subheader("🧩 Event Plan Summary")
+        for section, content in plan["summary"].items():
+            st.markdown(f"### 🔹 {section.capitalize()}")
+            st.json(content)
+    except Exception as e:
+        st.error(f"❌ Error: {e}")
@@ -0,0 +1,136 @@
+"""
+Batch event planning from a JSONL file.
+
+Each input line is a JSON object with a "query" (free-text event description)
+or a ready-made "intent", plus an optional "id" / "request_id". Results are
+appended to the output JSONL as soon as each plan finishes, one line per
+request with its status and timings. Requests whose id already has an "ok"
+line in the output are skipped, so a crashed run can simply be restarted.
+Lines that are not a JSON object get an error record (id "line-N") and the
+batch keeps going.
+
+Usage:
+    python batch_planner.py events.jsonl plans.jsonl --workers 4
+"""
+import argparse
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from orchestrator import orchestrated_event_plan
+from user_intent_agent import extract_user_intent
+
+# ✅ Read ids that already finished successfully (only ids are kept in memory)
+def load_completed_ids(output_path):
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a half-written line from a crash
+            if record.get("status") == "ok":
+                completed.add(record.get("id"))
+    return completed
+
+# ✅ Stream (id, request, error) triples from the input file; unreadable lines carry an error instead
+def iter_requests(input_path):
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError(f"expected a JSON object, got {type(request).__name__}")
+            except ValueError as e:  # JSONDecodeError is a ValueError
+                yield f"line-{line_no}", None, f"Invalid request line: {e}"
+                continue
+            request_id = str(request.get("id") or request.get("request_id") or f"line-{line_no}")
+            yield request_id, request, None
+
+# ✅ Plan a single event: intent extraction (if needed) + full orchestration
+def plan_one(request_id, request, plan_workers):
+    timing = {}
+    started = time.perf_counter()
+    try:
+        intent = request.get("intent")
+        if intent is None:
+            query = request.get("query")
+            if not query:
+                raise ValueError("Request needs a 'query' or an 'intent'.")
+            intent = extract_user_intent(query)
+            timing["intent"] = round(time.perf_counter() - started, 3)
+
+        plan_started = time.perf_counter()
+        plan = orchestrated_event_plan(intent, max_workers=plan_workers)
+        timing["plan"] = round(time.perf_counter() - plan_started, 3)
+        record = {"id": request_id, "status": "ok", "plan": plan}
+    except Exception as e:
+        record = {"id": request_id, "status": "error", "error": str(e),
+                  "traceback": traceback.format_exc()}
+
+    timing["total"] = round(time.perf_counter() - started, 3)
+    record["timing"] = timing
+    return record
+
+def run_batch(input_path, output_path, workers=4, plan_workers=8):
+    """
+    Plan every request in `input_path` on a pool of `workers` threads.
+    At most 2 * workers requests are read ahead, so memory stays constant
+    regardless of input size.
+    """
+    completed = load_completed_ids(output_path)
+    if completed:
+        print(f"🔁 Resuming: {len(completed)} requests already planned")
+
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    max_in_flight = workers * 2
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        in_flight = set()
+
+        def write(record):
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+            counts[record["status"]] += 1
+            print(f"{'✅' if record['status'] == 'ok' else '❌'} {record['id']} "
+                  f"({record['timing']['total']:.1f}s)")
+
+        def drain(block_until):
+            nonlocal in_flight
+            while len(in_flight) > block_until:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future.result())
+
+        for request_id, request, error in iter_requests(input_path):
+            if error:
+                # A bad line is reported and the batch keeps going
+                write({"id": request_id, "status": "error", "error": error, "timing": {"total": 0.0}})
+                continue
+            if request_id in completed:
+                counts["skipped"] += 1
+                continue
+            in_flight.add(pool.submit(plan_one, request_id, request, plan_workers))
+            drain(block_until=max_in_flight - 1)
+        drain(block_until=0)
+
+    print(f"\n📊 Batch complete: {counts['ok']} ok, {counts['error']} failed, {counts['skipped']} skipped")
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plan many events from a JSONL file.")
+    parser.add_argument("input", help="Input JSONL with one event request per line")
+    parser.add_argument("output", help="Output JSONL; existing successful ids are skipped")
+    parser.add_argument("--workers", type=int, default=4, help="Events planned concurrently")
+    parser.add_argument("--plan-workers", type=int, default=8, help="Agent threads per event plan")
+    args = parser.parse_args()
+
+    run_batch(args.input, args.output, workers=args.workers, plan_workers=args.plan_workers)
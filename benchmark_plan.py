@@ -0,0 +1,98 @@
+"""
+Record a full event plan once, then replay it offline for benchmarking.
+
+Recording needs the usual API keys and captures every model call, Google /
+Open-Meteo / Ares request and DuckDuckGo search into a cassette file.
+Replay needs no network or keys and serves the cassette back with an
+injected latency, so plan timings are repeatable on any machine.
+
+Usage:
+    python benchmark_plan.py record intent.json plan.cassette.json
+    python benchmark_plan.py replay intent.json plan.cassette.json --model-latency 1.5 --http-latency 0.2 --runs 3
+    python benchmark_plan.py replay intent.json plan.cassette.json --shift-days 30  # replay "a month later"
+
+The intent file holds a ready-made intent dict, or {"query": "..."} to
+include intent extraction in the recording.
+"""
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+
+from agentpro import use_cassette
+from google_places import SEARCH_CACHE_TTL, PlacesCache, get_places_client
+from poi_index import POIIndex
+
+def load_intent(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@contextmanager
+def shifted_clock(days):
+    """Make agents see a date `days` from today, to check a cassette replays on later days."""
+    import agentpro.react_agent as react_agent
+    real_datetime = react_agent.datetime
+
+    class ShiftedDatetime(real_datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return real_datetime.now(tz) + timedelta(days=days)
+
+    react_agent.datetime = ShiftedDatetime
+    try:
+        yield
+    finally:
+        react_agent.datetime = real_datetime
+
+def plan_once(request):
+    # Imported lazily: the agent modules read API keys at import time
+    from orchestrator import orchestrated_event_plan
+    from user_intent_agent import extract_user_intent
+
+    started = time.perf_counter()
+    intent = extract_user_intent(request["query"]) if "query" in request else request
+    plan = orchestrated_event_plan(intent)
+    return plan, time.perf_counter() - started
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record or replay an event plan cassette.")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("intent", help="JSON file with the user intent (or {\"query\": ...})")
+    parser.add_argument("cassette", help="Cassette file to write (record) or read (replay)")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Seconds added to each replayed model call")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="Seconds added to each replayed HTTP call / search")
+    parser.add_argument("--runs", type=int, default=1, help="Replay the plan this many times")
+    parser.add_argument("--shift-days", type=int, default=0,
+                        help="Replay with the agents' clock this many days ahead of the recording")
+    args = parser.parse_args()
+
+    if args.mode == "replay":
+        # Keys are never sent anywhere during replay, but the agent modules require them
+        for name in ("OPENAI_API_KEY", "GOOGLE_API_KEY"):
+            os.environ.setdefault(name, "replay")
+
+    request = load_intent(args.intent)
+    latency = {"model": args.model_latency, "http": args.http_latency, "tools": args.http_latency}
+    runs = args.runs if args.mode == "replay" else 1
+
+    durations = []
+    for run in range(1, runs + 1):
+        # Start every run with empty Places caches so recordings capture every
+        # Places call and replays pay their latency like a cold run would
+        places = get_places_client()
+        places.details_cache, places.search_cache = PlacesCache(path=None), PlacesCache(path=None)
+        if places.poi_index is not None:
+            places.poi_index = POIIndex(ttl=SEARCH_CACHE_TTL)
+        # Agent modules (and their prompts) are built on first import, inside the shifted clock
+        clock = shifted_clock(args.shift_days) if args.mode == "replay" and args.shift_days else nullcontext()
+        with clock, use_cassette(args.cassette, mode=args.mode, latency=latency):
+            plan, duration = plan_once(request)
+        durations.append(duration)
+        print(f"\n⏱️ Run {run}: {duration:.2f}s")
+        print(json.dumps(plan["timings"], indent=2))
+
+    if len(durations) > 1:
+        print(f"\n📊 {len(durations)} runs: min {min(durations):.2f}s, max {max(durations):.2f}s, "
+              f"mean {sum(durations) / len(durations):.2f}s")
@@ -7,6 +7,7 @@ import requests
 sys.path.insert(0, "/content/AgentPro")
 from agentpro import ReactAgent, create_model
 from agentpro.tools.mealplanner_tool import MealPlannerTool
+from google_places import get_places_client, map_concurrent
 
 # Load keys from environment
 GOOGLE_API_KEY = os.environ["GOOGLE_API_KEY"]
@@ -14,8 +15,9 @@ OPENAI_API_KEY = os.environ["OPENAI_API_KEY"]
 
 # Create model and agent
 model = create_model(provider="openai", model_name="gpt-4o", api_key=OPENAI_API_KEY)
-meal_tool = MealPlannerTool()
+meal_tool = MealPlannerTool(model=model)  # Reuse the agent's client and its connection pool
 agent = ReactAgent(model=model, tools=[meal_tool])
+
 def extract_json_from_response(response):
     cleaned = response.strip()
     cleaned = re.sub(r"```(?:json|python)?", "", cleaned)
@@ -61,10 +63,9 @@ def catering_agent(user_intent, schedule):
 
 
     # 🔍 Use Google Places to find caterers
-    caterer_recommendations = {}
-    for meal in ["breakfast", "lunch", "dinner"]:  # Simplified; can use meal_plan keys
-        vendors = search_caterers(location, meal)
-        caterer_recommendations[meal] = vendors
+    meals = ["breakfast", "lunch", "dinner"]  # Simplified; can use meal_plan keys
+    results = map_concurrent(lambda meal: search_caterers(location, meal), meals)
+    caterer_recommendations = dict(zip(meals, results))
 
     return {
         "catering_plan": meal_plan,
@@ -73,30 +74,14 @@ def catering_agent(user_intent, schedule):
 
 # 📍 Google Places search
 def search_caterers(location, meal_type, limit=3):
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    params = {
-        "query": f"{meal_type} catering near {location}",
-        "key": GOOGLE_API_KEY
-    }
-    res = requests.get(url, params=params).json()
-    results = res.get("results", [])[:limit]
-
     caterers = []
-    for r in results:
-        place_id = r.get("place_id")
-        detail_url = "https://maps.googleapis.com/maps/api/place/details/json"
-        detail_params = {
-            "place_id": place_id,
-            "fields": "name,rating,formatted_address,formatted_phone_number,website",
-            "key": GOOGLE_API_KEY
-        }
-        d = requests.get(detail_url, params=detail_params).json().get("result", {})
+    for place, d in get_places_client().search_details(f"{meal_type} catering near {location}", limit):
         caterers.append({
-            "name": d.get("name"),
-            "rating": d.get("rating", "N/A"),
-            "address": d.get("formatted_address"),
-            "phone": d.get("formatted_phone_number", "N/A"),
-            "website": d.get("website", "N/A")
+            "name": d.name,
+            "rating": d.rating or "N/A",
+            "address": d.address,
+            "phone": d.phone or "N/A",
+            "website": d.website or "N/A"
         })
 
     return caterers
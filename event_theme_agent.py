@@ -4,6 +4,7 @@ import ast
 import re
 import requests
 from agentpro import ReactAgent, create_model
+from google_places import get_places_client, map_concurrent
 
 # ✅ Use OpenAI API Key
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -13,6 +14,8 @@ assert OPENAI_API_KEY, "❌ Missing OPENAI_API_KEY in environment"
 model = create_model(provider="openai", model_name="gpt-4o", api_key=OPENAI_API_KEY)
 agent = ReactAgent(model=model, tools=[])
 
+THEME_INTENT_FIELDS = ["event_type", "location", "event_theme", "guest_count", "preferences"]
+
 
 def extract_json_from_response(response):
     cleaned = response.strip()
@@ -34,30 +37,14 @@ def extract_json_from_response(response):
 
 
 def get_vendor_details(query, location, limit=3):
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    params = {
-        "query": f"{query} near {location}",
-        "key": os.getenv("GOOGLE_API_KEY")
-    }
-    res = requests.get(url, params=params).json()
-    results = res.get("results", [])[:limit]
-
     vendors = []
-    for r in results:
-        place_id = r.get("place_id")
-        details_url = "https://maps.googleapis.com/maps/api/place/details/json"
-        details_params = {
-            "place_id": place_id,
-            "fields": "name,rating,formatted_address,formatted_phone_number,website",
-            "key": os.getenv("GOOGLE_API_KEY")
-        }
-        details = requests.get(details_url, params=details_params).json().get("result", {})
+    for place, details in get_places_client().search_details(f"{query} near {location}", limit):
         vendors.append({
-            "name": details.get("name"),
-            "address": details.get("formatted_address"),
-            "phone": details.get("formatted_phone_number", "N/A"),
-            "website": details.get("website", "N/A"),
-            "rating": details.get("rating", "N/A"),
+            "name": details.name,
+            "address": details.address,
+            "phone": details.phone or "N/A",
+            "website": details.website or "N/A",
+            "rating": details.rating or "N/A",
             "type": query
         })
     return vendors
@@ -72,9 +59,9 @@ def analyze_theme(user_intent):
         "Return only a valid JSON object with no code block markers, no explanation, no markdown, no labels — just the raw JSON."
         "Return as a JSON dictionary with keys: theme_name, style_description, required_elements, branding_notes.\n"
         "IMPORTANT: Respond immediately with the final JSON object using only `Final Answer:` followed by the valid JSON. Do NOT output thoughts, actions, or any reasoning."
-        f"user_intent = {json.dumps(user_intent, indent=2)}"
+        f"user_intent = {json.dumps({k: user_intent.get(k) for k in THEME_INTENT_FIELDS}, indent=2)}"
     )
-    response = agent.run(prompt)
+    response = agent.run_structured(prompt)
     return extract_json_from_response(response.final_answer)
 
 def theme_agent(user_intent):
@@ -88,9 +75,10 @@ def theme_agent(user_intent):
     if isinstance(required_elements, dict):
         required_elements = [item.get("item") for item in required_elements.get("decor", []) if item.get("item")]
 
+    # 🔎 One concurrent Places search per decor element
     vendor_list = []
-    for item in required_elements:
-        vendor_list.extend(get_vendor_details(item, location))
+    for vendors in map_concurrent(lambda item: get_vendor_details(item, location), required_elements):
+        vendor_list.extend(vendors)
 
     return {
         "recommended": {
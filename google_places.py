@@ -0,0 +1,573 @@
+"""
+Google Places / Geocoding gateway shared by every agent.
+
+All Places traffic goes through one PlacesClient: a pooled keep-alive
+requests.Session with timeouts, typed result records, per-endpoint
+metrics, shared Text Search / Place Details caches and a local POI index, so optimizations apply to every
+agent at once.
+"""
+import contextvars
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from agentpro.cache import ResponseCache
+
+try:
+    from poi_index import POIIndex
+    POI_INDEX_AVAILABLE = True
+except ImportError:
+    POI_INDEX_AVAILABLE = False
+    print("Warning: numpy not installed. Places lookups will not use the local POI index.")
+
+TEXT_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+NEARBY_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+# ⏱️ Timeout (seconds) for every outbound HTTP call (Places, weather), so one stuck request cannot stall the plan
+HTTP_TIMEOUT = 15
+
+# Keep-alive connections to maps.googleapis.com shared by all agents
+POOL_SIZE = int(os.environ.get("PLACES_POOL_SIZE", "20"))
+
+# Contact fields every agent asks Place Details for
+DETAIL_FIELDS = "name,rating,formatted_address,formatted_phone_number,website"
+
+# Fields a Text Search result already carries, so Details is skipped when these suffice
+TEXT_SEARCH_FIELDS = {"place_id", "name", "formatted_address", "rating", "types", "geometry"}
+
+# 📍 Nearby searches snap to a grid of this many decimal places (3 ≈ 110 m), so
+# venues next to each other share one request and one cache entry
+NEARBY_GRID_DECIMALS = 3
+
+# 📍 Points within this many meters of a cluster's seed share one nearby search
+CLUSTER_RADIUS_M = float(os.environ.get("PLACES_CLUSTER_RADIUS_M", "500"))
+
+# 💾 Places caches: in-memory LRU in front of an on-disk store
+PLACES_CACHE_PATH = os.environ.get("PLACES_CACHE_PATH", ".places_cache.sqlite")
+PLACES_CACHE_MEMORY_ENTRIES = int(os.environ.get("PLACES_CACHE_MEMORY_ENTRIES", "2000"))
+PLACES_CACHE_DISK_ENTRIES = int(os.environ.get("PLACES_CACHE_DISK_ENTRIES", "50000"))
+DETAILS_CACHE_TTL = float(os.environ.get("PLACES_CACHE_TTL", str(7 * 24 * 3600)))
+# Rankings change faster than contact details
+SEARCH_CACHE_TTL = float(os.environ.get("PLACES_SEARCH_CACHE_TTL", str(24 * 3600)))
+
+# ✅ Text-search query normalization, so equivalent queries share a cache entry
+QUERY_STOPWORDS = {"a", "an", "the", "for", "of"}
+QUERY_SYNONYMS = {
+    "caterer": "catering",
+    "photographer": "photography",
+    "florist": "flowers",
+    "flower": "flowers",
+    "djs": "dj",
+    "carpark": "parking",
+    "car park": "parking",
+    "parking lot": "parking",
+    "centre": "center",
+    "theatre": "theater",
+}
+# Words ending in "s" that are not plurals
+QUERY_KEEP_S = {"bus", "gas", "glass", "class", "press", "business", "express", "canvas", "lens", "news", "sports"}
+
+def _singular(word: str) -> str:
+    if word in QUERY_KEEP_S or len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "xes")):
+        return word[:-2]
+    return word[:-1] if word.endswith("s") else word
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace, punctuation, plural and synonym folding of a Text Search query."""
+    words = re.sub(r"[^\w\s]", " ", query.lower()).split()
+    text = " ".join(_singular(word) for word in words if word not in QUERY_STOPWORDS)
+    for phrase, replacement in QUERY_SYNONYMS.items():
+        if " " in phrase:
+            text = re.sub(rf"\b{phrase}\b", replacement, text)
+    return " ".join(QUERY_SYNONYMS.get(word, word) for word in text.split())
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def map_concurrent(fn: Callable[[T], R], items: Iterable[T], max_workers: int = POOL_SIZE) -> List[R]:
+    """
+    Run fn over items on a bounded thread pool and return results in order.
+    Each item runs in a copy of the caller's context, so usage tags follow it.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    contexts = [contextvars.copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))), thread_name_prefix="places") as pool:
+        return list(pool.map(lambda ctx, item: ctx.run(fn, item), contexts, items))
+
+# ✅ One text-search hit
+@dataclass
+class PlaceSummary:
+    place_id: Optional[str] = None
+    name: Optional[str] = None
+    address: Optional[str] = None
+    rating: Optional[float] = None
+    types: List[str] = field(default_factory=list)
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+
+    @classmethod
+    def from_api(cls, result: Dict[str, Any]) -> "PlaceSummary":
+        location = result.get("geometry", {}).get("location", {})
+        return cls(
+            place_id=result.get("place_id"),
+            name=result.get("name"),
+            address=result.get("formatted_address"),
+            rating=result.get("rating"),
+            types=result.get("types", []),
+            lat=location.get("lat"),
+            lng=location.get("lng"),
+        )
+
+    def to_details(self) -> "PlaceDetails":
+        return PlaceDetails(place_id=self.place_id, name=self.name, address=self.address, rating=self.rating)
+
+# ✅ Contact details of one place
+@dataclass
+class PlaceDetails:
+    place_id: Optional[str] = None
+    name: Optional[str] = None
+    address: Optional[str] = None
+    phone: Optional[str] = None
+    website: Optional[str] = None
+    rating: Optional[float] = None
+
+    @classmethod
+    def from_api(cls, place_id: str, result: Dict[str, Any]) -> "PlaceDetails":
+        return cls(
+            place_id=place_id,
+            name=result.get("name"),
+            address=result.get("formatted_address"),
+            phone=result.get("formatted_phone_number"),
+            website=result.get("website"),
+            rating=result.get("rating"),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+# ✅ Spatial helpers
+def distance_m(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Great-circle (haversine) distance in meters between two (lat, lng) points."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6_371_000 * math.asin(math.sqrt(h))
+
+@dataclass
+class Cluster:
+    center: Tuple[float, float]
+    members: List[int]
+    extent_m: float = 0.0  # Farthest member from the center
+
+def cluster_points(points: List[Tuple[float, float]], radius_m: float = CLUSTER_RADIUS_M) -> List[Cluster]:
+    """
+    Greedy radius clustering: each point joins the first cluster whose seed
+    is within `radius_m`, else seeds a new one. Cheap and good enough for
+    the handful of venues in a plan.
+    """
+    seeds: List[Tuple[float, float]] = []
+    members: List[List[int]] = []
+    for index, point in enumerate(points):
+        for seed, group in zip(seeds, members):
+            if distance_m(seed, point) <= radius_m:
+                group.append(index)
+                break
+        else:
+            seeds.append(point)
+            members.append([index])
+
+    clusters = []
+    for group in members:
+        center = (sum(points[i][0] for i in group) / len(group), sum(points[i][1] for i in group) / len(group))
+        clusters.append(Cluster(center, group, max(distance_m(center, points[i]) for i in group)))
+    return clusters
+
+class PlacesCache:
+    """
+    Two-tier cache for JSON-compatible Places responses.
+
+    Lookups hit an in-memory LRU first, then the on-disk store (SQLite, shared
+    between runs; pass path=None for memory only). Both tiers expire entries
+    after `ttl` seconds. Concurrent misses for the same key are coalesced into
+    one API call. Caches sharing `path` keep their entries in separate tables.
+    Thread-safe.
+    """
+    def __init__(self, path: Optional[str] = PLACES_CACHE_PATH, ttl: float = DETAILS_CACHE_TTL,
+                 memory_entries: int = PLACES_CACHE_MEMORY_ENTRIES, disk_entries: int = PLACES_CACHE_DISK_ENTRIES,
+                 table: str = "places"):
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._disk = ResponseCache(path, ttl=ttl, max_entries=disk_entries, table=table) if path else None
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._metrics = {"memory_hits": 0, "disk_hits": 0, "coalesced": 0, "misses": 0}
+
+    def _from_memory(self, key: str) -> Any:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > self.ttl:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry[1]
+
+    def _from_disk(self, key: str) -> Any:
+        if self._disk is None:
+            return None
+        entry = self._disk.get_entry(key)
+        if entry is None:
+            return None
+        value = json.loads(entry[0])
+        # Keep the disk entry's age, so it expires from memory when it would have on disk
+        self._remember(key, value, created=entry[1])
+        with self._lock:
+            self._metrics["disk_hits"] += 1
+        return value
+
+    def _remember(self, key: str, value: Any, created: Optional[float] = None):
+        with self._lock:
+            self._memory[key] = (created if created is not None else time.time(), value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Tuple[Any, bool]]) -> Any:
+        """
+        Cached value, or the result of fetch() -> (value, cacheable).
+        Only cacheable results (successful API responses) are stored.
+        Values are shared between callers, so treat them as read-only.
+        """
+        with self._lock:
+            value = self._from_memory(key)
+            if value is not None:
+                self._metrics["memory_hits"] += 1
+                return value
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                leader = True
+            else:
+                self._metrics["coalesced"] += 1
+                leader = False
+        if not leader:
+            return pending.result()
+
+        try:
+            value = self._from_disk(key)
+            if value is None:
+                with self._lock:
+                    self._metrics["misses"] += 1
+                value, cacheable = fetch()
+                if cacheable:
+                    self._remember(key, value)
+                    if self._disk is not None:
+                        self._disk.set(key, json.dumps(value))
+            pending.set_result(value)
+            return value
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def created_at(self, key: str) -> float:
+        """When the cached value for `key` was fetched (now, if it is not in memory)."""
+        with self._lock:
+            entry = self._memory.get(key)
+        return entry[0] if entry is not None else time.time()
+
+    def items(self, prefix: str = "") -> List[Tuple[str, Any, float]]:
+        """Unexpired (key, value, created) entries from both tiers whose key starts with `prefix`."""
+        entries = {}
+        if self._disk is not None:
+            entries.update((key, (json.loads(value), created)) for key, value, created in self._disk.items(prefix))
+        now = time.time()
+        with self._lock:
+            entries.update((key, (value, stored)) for key, (stored, value) in self._memory.items()
+                           if key.startswith(prefix) and now - stored <= self.ttl)
+        return [(key, value, created) for key, (value, created) in entries.items()]
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._metrics = dict.fromkeys(self._metrics, 0)
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["memory_entries"] = len(self._memory)
+        lookups = metrics["memory_hits"] + metrics["disk_hits"] + metrics["coalesced"] + metrics["misses"]
+        metrics["hit_rate"] = round((lookups - metrics["misses"]) / lookups, 3) if lookups else 0.0
+        return metrics
+
+class PlacesClient:
+    """Thread-safe client for Places Text Search, Place Details and Geocoding."""
+    def __init__(self, api_key: Optional[str] = None, timeout: float = HTTP_TIMEOUT, pool_size: int = POOL_SIZE,
+                 details_cache: Optional[PlacesCache] = None, search_cache: Optional[PlacesCache] = None,
+                 poi_index: Optional["POIIndex"] = None):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.details_cache = details_cache
+        self.search_cache = search_cache
+        self.poi_index = poi_index
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        # Bounds in-flight calls across all threads to the connection pool size
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    def _record(self, endpoint: str, seconds: float, ok: bool):
+        with self._lock:
+            metrics = self._metrics.setdefault(endpoint, {"calls": 0, "errors": 0, "seconds": 0.0})
+            metrics["calls"] += 1
+            metrics["errors"] += not ok
+            metrics["seconds"] += seconds
+
+    def _get(self, endpoint: str, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        # Read the key per call so it can be set after import (e.g. in the Gradio UI)
+        params = {**params, "key": self.api_key or os.getenv("GOOGLE_API_KEY")}
+        with self._slots:
+            return self._send(endpoint, url, params)
+
+    def _send(self, endpoint: str, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        ok = False
+        try:
+            data = self.session.get(url, params=params, timeout=self.timeout).json()
+            status = data.get("status", "OK")
+            ok = status in ("OK", "ZERO_RESULTS")
+            if not ok:
+                print(f"⚠️ Google {endpoint} returned {status}: {data.get('error_message', '')}")
+            return data
+        finally:
+            self._record(endpoint, time.perf_counter() - started, ok)
+
+    def text_search(self, query: str, limit: Optional[int] = None) -> List[PlaceSummary]:
+        """
+        Ranked Text Search hits. The full ranked list is cached under the
+        normalized query, so any `limit` is served from one entry.
+        """
+        key = f"search|{normalize_query(query)}"
+        if self.search_cache is None:
+            results = self._fetch_text_search(query)[0]
+        else:
+            results = self.search_cache.get_or_fetch(key, lambda: self._fetch_text_search(query))
+        places = [PlaceSummary(**r) for r in results]
+        if self.poi_index is not None:
+            self.poi_index.add(places, self._created_at(key))
+        return places[:limit]
+
+    def _fetch_text_search(self, query: str) -> Tuple[List[Dict[str, Any]], bool]:
+        data = self._get("text_search", TEXT_SEARCH_URL, {"query": query})
+        results = [asdict(PlaceSummary.from_api(r)) for r in data.get("results", [])]
+        return results, data.get("status") in ("OK", "ZERO_RESULTS")
+
+    def details(self, place_id: str, fields: str = DETAIL_FIELDS) -> PlaceDetails:
+        if self.details_cache is None or not place_id:
+            return PlaceDetails(**self._fetch_details(place_id, fields)[0])
+        key = f"details|{place_id}|{','.join(sorted(fields.split(',')))}"
+        return PlaceDetails(**self.details_cache.get_or_fetch(key, lambda: self._fetch_details(place_id, fields)))
+
+    def _fetch_details(self, place_id: str, fields: str) -> Tuple[Dict[str, Any], bool]:
+        data = self._get("details", DETAILS_URL, {"place_id": place_id, "fields": fields})
+        return PlaceDetails.from_api(place_id, data.get("result", {})).as_dict(), data.get("status") == "OK"
+
+    def details_many(self, place_ids: Iterable[str], fields: str = DETAIL_FIELDS) -> List[PlaceDetails]:
+        """Place Details for several places, fetched concurrently (duplicates fetched once)."""
+        place_ids = list(place_ids)
+        unique = list(dict.fromkeys(place_ids))
+        fetched = dict(zip(unique, map_concurrent(lambda place_id: self.details(place_id, fields), unique)))
+        return [fetched[place_id] for place_id in place_ids]
+
+    def nearby_search(self, lat: float, lng: float, radius: int = 1500, place_type: Optional[str] = None,
+                      keyword: Optional[str] = None, limit: Optional[int] = None) -> List[PlaceSummary]:
+        """
+        Places within `radius` meters of a coordinate, optionally filtered by
+        Places type (e.g. "parking", "lodging") and keyword. The location is
+        snapped to a small grid so nearby venues share one cached request.
+        Answered from the local POI index when it covers the area.
+        """
+        keyword_key = normalize_query(keyword or "")
+        # Snapped before the index lookup too: coverage is recorded for the snapped search area
+        lat, lng = round(lat, NEARBY_GRID_DECIMALS), round(lng, NEARBY_GRID_DECIMALS)
+        if self.poi_index is not None:
+            local = self.poi_index.query(lat, lng, radius, place_type, keyword_key, limit)
+            if local is not None:
+                return [place for place, _ in local]
+
+        params = {"location": f"{lat},{lng}", "radius": radius}
+        if place_type:
+            params["type"] = place_type
+        if keyword:
+            params["keyword"] = keyword
+        key = f"nearby|{lat},{lng}|{radius}|{place_type or ''}|{keyword_key}"
+        if self.search_cache is None:
+            results = self._fetch_nearby(params)[0]
+        else:
+            results = self.search_cache.get_or_fetch(key, lambda: self._fetch_nearby(params))
+        places = [PlaceSummary(**r) for r in results]
+        if self.poi_index is not None:
+            created = self._created_at(key)
+            self.poi_index.add(places, created)
+            self.poi_index.add_coverage(lat, lng, radius, place_type, keyword_key, len(places), created)
+        return places[:limit]
+
+    def nearby_search_many(self, points: List[Tuple[float, float]], radius: int = 1500,
+                           place_type: Optional[str] = None, keyword: Optional[str] = None,
+                           limit: Optional[int] = None,
+                           cluster_radius: float = CLUSTER_RADIUS_M) -> List[List[Tuple[PlaceSummary, float]]]:
+        """
+        Nearby search for several points with one request per spatial cluster.
+        Each point gets the cluster's hits within `radius` of it, nearest
+        first, as (place, distance in meters).
+        """
+        clusters = cluster_points(points, cluster_radius)
+        keyword_key = normalize_query(keyword or "")
+
+        def search(cluster: Cluster) -> List[List[Tuple[PlaceSummary, float]]]:
+            # Served locally when the POI index can answer for every member
+            if self.poi_index is not None:
+                local = [self.poi_index.query(*points[index], radius, place_type, keyword_key, limit)
+                         for index in cluster.members]
+                if all(hits is not None for hits in local):
+                    return local
+
+            # Widen the radius to cover every member around the snapped center (so the
+            # recorded coverage contains each member's own search); rounded up so the cache key stays stable
+            snapped = (round(cluster.center[0], NEARBY_GRID_DECIMALS), round(cluster.center[1], NEARBY_GRID_DECIMALS))
+            reach = radius + cluster.extent_m + distance_m(cluster.center, snapped)
+            cluster_radius_m = int(reach // 100 + 1) * 100
+            places = self.nearby_search(*cluster.center, radius=cluster_radius_m, place_type=place_type, keyword=keyword)
+            located = [place for place in places if place.lat is not None and place.lng is not None]
+            member_hits = []
+            for index in cluster.members:
+                ranked = sorted(((place, distance_m(points[index], (place.lat, place.lng))) for place in located),
+                                key=lambda hit: hit[1])
+                member_hits.append([hit for hit in ranked if hit[1] <= radius][:limit])
+            return member_hits
+
+        results: List[List[Tuple[PlaceSummary, float]]] = [[] for _ in points]
+        for cluster, member_hits in zip(clusters, map_concurrent(search, clusters)):
+            for index, hits in zip(cluster.members, member_hits):
+                results[index] = hits
+        return results
+
+    def _fetch_nearby(self, params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], bool]:
+        data = self._get("nearby_search", NEARBY_SEARCH_URL, params)
+        # Nearby Search returns "vicinity" rather than a full formatted address
+        results = [asdict(PlaceSummary.from_api({"formatted_address": r.get("vicinity"), **r}))
+                   for r in data.get("results", [])]
+        return results, data.get("status") in ("OK", "ZERO_RESULTS")
+
+    def with_details(self, places: List[PlaceSummary],
+                     fields: str = DETAIL_FIELDS) -> List[Tuple[PlaceSummary, PlaceDetails]]:
+        """
+        Pair search hits with their Place Details, fetched concurrently, or
+        not at all when the requested fields are already in the search payload.
+        """
+        if set(fields.split(",")) <= TEXT_SEARCH_FIELDS:
+            return [(place, place.to_details()) for place in places]
+        return list(zip(places, self.details_many([place.place_id or "" for place in places], fields)))
+
+    def search_details(self, query: str, limit: int = 3,
+                       fields: str = DETAIL_FIELDS) -> List[Tuple[PlaceSummary, PlaceDetails]]:
+        """Text search plus Place Details for each of the top `limit` hits."""
+        return self.with_details(self.text_search(query, limit), fields)
+
+    def geocode(self, address: str) -> Optional[Tuple[float, float]]:
+        """Coordinates of an address; cached with the Place Details, as they rarely change."""
+        if self.details_cache is None:
+            location = self._fetch_geocode(address)[0]
+        else:
+            location = self.details_cache.get_or_fetch(f"geocode|{' '.join(address.lower().split())}",
+                                                       lambda: self._fetch_geocode(address))
+        return tuple(location) if location else None
+
+    def _fetch_geocode(self, address: str) -> Tuple[Optional[List[float]], bool]:
+        data = self._get("geocode", GEOCODE_URL, {"address": address})
+        results = data.get("results", [])
+        if not results:
+            return None, False
+        location = results[0]["geometry"]["location"]
+        return [location["lat"], location["lng"]], True
+
+    def locate(self, place: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        """Coordinates of a result dict: its own lat/lng if it carries them, else its geocoded address."""
+        if place.get("lat") is not None and place.get("lng") is not None:
+            return place["lat"], place["lng"]
+        address = place.get("address") or place.get("formatted_address")
+        return self.geocode(address) if address and address != "N/A" else None
+
+    def _created_at(self, key: str) -> Optional[float]:
+        # Age of a search result, so the POI index expires it with the search cache
+        return self.search_cache.created_at(key) if self.search_cache is not None else None
+
+    def warm_poi_index(self):
+        """
+        Load every unexpired cached Text Search / Nearby Search result into the
+        POI index, keeping its fetch time so it expires there on schedule too.
+        """
+        if self.poi_index is None or self.search_cache is None:
+            return
+        for key, results, created in self.search_cache.items("search|"):
+            self.poi_index.add((PlaceSummary(**r) for r in results), created)
+        for key, results, created in self.search_cache.items("nearby|"):
+            # Key layout: nearby|lat,lng|radius|type|keyword (see nearby_search)
+            _, location, radius, place_type, keyword = key.split("|", 4)
+            lat, lng = map(float, location.split(","))
+            places = [PlaceSummary(**r) for r in results]
+            self.poi_index.add(places, created)
+            self.poi_index.add_coverage(lat, lng, int(radius), place_type or None, keyword, len(places), created)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, errors and total/average seconds per endpoint, plus cache and POI index hits."""
+        with self._lock:
+            metrics = {endpoint: dict(m) for endpoint, m in self._metrics.items()}
+        for m in metrics.values():
+            m["avg_seconds"] = round(m["seconds"] / m["calls"], 3) if m["calls"] else 0.0
+            m["seconds"] = round(m["seconds"], 3)
+        if self.details_cache is not None:
+            metrics["details_cache"] = self.details_cache.stats()
+        if self.search_cache is not None:
+            metrics["search_cache"] = self.search_cache.stats()
+        if self.poi_index is not None:
+            metrics["poi_index"] = self.poi_index.stats()
+        return metrics
+
+_client: Optional[PlacesClient] = None
+_client_lock = threading.Lock()
+
+def get_places_client() -> PlacesClient:
+    """Process-wide PlacesClient shared by all agents."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = PlacesClient(details_cache=PlacesCache(ttl=DETAILS_CACHE_TTL, table="place_details"),
+                                   search_cache=PlacesCache(ttl=SEARCH_CACHE_TTL, table="place_searches"),
+                                   poi_index=POIIndex(ttl=SEARCH_CACHE_TTL) if POI_INDEX_AVAILABLE else None)
+            _client.warm_poi_index()
+        return _client
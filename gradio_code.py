@@ -1,73 +1,99 @@
 !pip install gradio
 !python gradio_app.py
 import gradio as gr
+from orchestrator import AGENT_NODES, iter_event_plan
+from plan_executor import PlanExecutor
 
-# Global state
-user_intent_state = {}
+# Agents shared by every session; results are cached per session in gr.State
+agent_graph = PlanExecutor(AGENT_NODES)
+
+def new_session():
+    return {"intent": None, "fingerprints": {}, "results": {}}
+
+def set_session_intent(session, intent):
+    """Store the intent for this session, keeping cached results whose inputs did not change."""
+    session = session or new_session()
+    fingerprints = agent_graph.fingerprints({"intent": intent})
+    previous = session.get("fingerprints") or {}
+    results = {name: value for name, value in session["results"].items()
+               if previous.get(name) == fingerprints.get(name)}
+    return {"intent": intent, "fingerprints": fingerprints, "results": results}
 
 # Unified extract + cache
-def extract_intent_interface(query):
+def extract_intent_interface(query, session):
     try:
         intent = extract_user_intent(query)
-        user_intent_state["intent"] = intent
-        return f"🎯 Intent extracted:\n```json\n{json.dumps(intent, indent=2)}\n```"
+        session = set_session_intent(session, intent)
+        return f"🎯 Intent extracted:\n```json\n{json.dumps(intent, indent=2)}\n```", session
     except Exception as e:
-        return f"❌ Error: {str(e)}"
+        return f"❌ Error: {str(e)}", session
 
-# Agent output wrappers
-def run_agent(agent_func, label):
+# Agent output wrappers: each agent (and anything it depends on) runs once per intent
+def run_agent(node_name, label, session):
+    session = session or new_session()
     try:
-        intent = user_intent_state.get("intent")
+        intent = session.get("intent")
         if not intent:
-            return "⚠️ Please extract intent first by entering a query."
-
-        if "schedule" in agent_func.__name__:
-            result = agent_func(intent)
-        elif "weather" in agent_func.__name__:
-            schedule = scheduler_agent(intent)
-            result = agent_func(intent, schedule)
-        elif "transport" in agent_func.__name__:
-            schedule = scheduler_agent(intent)
-            venues = venue_agent(intent)
-            result = agent_func(intent, venues, schedule)
-        elif "hotel" in agent_func.__name__:
-            venues = venue_agent(intent)
-            result = agent_func(intent, venues)
-        elif "sightseeing" in agent_func.__name__ or "catering" in agent_func.__name__:
-            schedule = scheduler_agent(intent)
-            result = agent_func(intent, schedule)
-        else:
-            result = agent_func(intent)
-
-        return f"### ✅ {label} Output\n```json\n{json.dumps(result, indent=2)}\n```"
+            return "⚠️ Please extract intent first by entering a query.", session
+
+        cached = session["results"]
+        for result in agent_graph.iter_results({"intent": intent}, targets=[node_name], cached=cached):
+            if result.degraded:
+                return f"⚠️ {label} unavailable ({result.name}: {result.error})", session
+            print(f"⏱️ {result.name} finished in {result.duration:.2f}s")
+            cached[result.name] = result.value
+
+        return f"### ✅ {label} Output\n```json\n{json.dumps(cached[node_name], indent=2)}\n```", session
     except Exception as e:
-        return f"❌ {label} failed: {str(e)}"
+        return f"❌ {label} failed: {str(e)}", session
 
-# Main plan button
-def run_orchestrator(query):
+# Main plan button: streams each section into the page as soon as it is ready
+def run_orchestrator(query, session):
     try:
         intent = extract_user_intent(query)
-        plan = orchestrated_event_plan(intent)
+        session = set_session_intent(session, intent)
 
         display = f"### 🎯 Extracted Intent\n```json\n{json.dumps(intent, indent=2)}\n```\n"
+        yield display + "⏳ Planning...", session
+
+        summary, summary_error = {}, None
+        for result in iter_event_plan(intent):
+            if result.name == "summary":
+                # A degraded summary (deadline hit or summarizer failed) has no value
+                summary, summary_error = result.value or {}, result.error if result.degraded else None
+                continue
+            title = result.name.replace('_', ' ').title()
+            if result.degraded:
+                display += f"#### ⚠️ {title} unavailable: {result.error}\n"
+                yield display + "⏳ Planning...", session
+                continue
+            # Reuse the full plan's agent outputs for the individual buttons
+            session["results"][result.name] = result.value
+            display += f"#### ✅ {title} ({result.duration:.1f}s)\n"
+            display += f"```json\n{json.dumps(result.value, indent=2)}\n```\n"
+            yield display + "⏳ Planning...", session
+
         display += "### 🧩 Event Summary\n"
-        for k, v in plan["summary"].items():
+        if summary_error:
+            display += f"#### ⚠️ Summary unavailable: {summary_error}\n"
+        for k, v in summary.items():
             display += f"#### {k.title()}\n```json\n{json.dumps(v, indent=2)}\n```\n"
-        return display
+        yield display, session
     except Exception as e:
-        return f"❌ Error during full planning: {e}"
+        yield f"❌ Error during full planning: {e}", session
 
 # Gradio UI
 with gr.Blocks(theme=gr.themes.Soft()) as app:
     gr.Markdown("# 🎉 AI Event Planner – Agent Explorer")
+    session = gr.State(new_session())
     query = gr.Textbox(label="📝 Describe your event")
     with gr.Row():
         intent_btn = gr.Button("🎯 Extract Intent")
         full_plan_btn = gr.Button("🧠 Generate Full Plan")
     intent_out = gr.Markdown()
 
-    intent_btn.click(fn=extract_intent_interface, inputs=query, outputs=intent_out)
-    full_plan_btn.click(fn=run_orchestrator, inputs=query, outputs=intent_out)
+    intent_btn.click(fn=extract_intent_interface, inputs=[query, session], outputs=[intent_out, session])
+    full_plan_btn.click(fn=run_orchestrator, inputs=[query, session], outputs=[intent_out, session])
 
     gr.Markdown("## 🧩 Individual Agent Outputs")
 
@@ -85,14 +111,14 @@ with gr.Blocks(theme=gr.themes.Soft()) as app:
 
     agent_output = gr.Markdown()
 
-    venue_btn.click(fn=lambda: run_agent(venue_agent, "Venues"), outputs=agent_output)
-    vendor_btn.click(fn=lambda: run_agent(vendors_agent, "Vendors"), outputs=agent_output)
-    schedule_btn.click(fn=lambda: run_agent(scheduler_agent, "Schedule"), outputs=agent_output)
-    catering_btn.click(fn=lambda: run_agent(catering_agent, "Catering"), outputs=agent_output)
-    transport_btn.click(fn=lambda: run_agent(transport_parking_agent, "Transport"), outputs=agent_output)
-    hotel_btn.click(fn=lambda: run_agent(hotel_booking_agent, "Hotels"), outputs=agent_output)
-    sightseeing_btn.click(fn=lambda: run_agent(sightseeing_agent, "Sightseeing"), outputs=agent_output)
-    weather_btn.click(fn=lambda: run_agent(weather_predictor_agent, "Weather"), outputs=agent_output)
-    theme_btn.click(fn=lambda: run_agent(theme_agent, "Theme"), outputs=agent_output)
+    venue_btn.click(fn=lambda s: run_agent("venues", "Venues", s), inputs=session, outputs=[agent_output, session])
+    vendor_btn.click(fn=lambda s: run_agent("vendors", "Vendors", s), inputs=session, outputs=[agent_output, session])
+    schedule_btn.click(fn=lambda s: run_agent("schedule", "Schedule", s), inputs=session, outputs=[agent_output, session])
+    catering_btn.click(fn=lambda s: run_agent("catering", "Catering", s), inputs=session, outputs=[agent_output, session])
+    transport_btn.click(fn=lambda s: run_agent("transportation", "Transport", s), inputs=session, outputs=[agent_output, session])
+    hotel_btn.click(fn=lambda s: run_agent("hotels", "Hotels", s), inputs=session, outputs=[agent_output, session])
+    sightseeing_btn.click(fn=lambda s: run_agent("sightseeing", "Sightseeing", s), inputs=session, outputs=[agent_output, session])
+    weather_btn.click(fn=lambda s: run_agent("weather_forecast", "Weather", s), inputs=session, outputs=[agent_output, session])
+    theme_btn.click(fn=lambda s: run_agent("theme", "Theme", s), inputs=session, outputs=[agent_output, session])
 
 app.launch(share=True)
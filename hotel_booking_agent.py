@@ -5,6 +5,7 @@ import ast
 import requests
 
 from agentpro import create_model, ReactAgent
+from google_places import get_places_client, map_concurrent
 
 # ✅ Load environment keys
 OPENAI_API_KEY = os.environ["OPENAI_API_KEY"]
@@ -14,6 +15,8 @@ GOOGLE_API_KEY = os.environ["GOOGLE_API_KEY"]
 model = create_model(provider="openai", model_name="gpt-4o", api_key=OPENAI_API_KEY)
 agent = ReactAgent(model=model, tools=[])
 
+HOTEL_INTENT_FIELDS = ["event_type", "location", "guest_count", "preferences"]
+
 # ✅ JSON-safe parser
 def extract_json_from_response(response):
     cleaned = response.strip()
@@ -43,44 +46,63 @@ def analyze_hotel_needs(user_intent, venues):
         "- 'priorities': list of preferences (e.g., budget, proximity, Wi-Fi)\n"
         "- 'suggested_hotels': optional hotel suggestions with name, type, rooms, amenities\n\n"
         "Return only a valid JSON object with no code block markers, no explanation, no markdown, no labels — just the raw JSON."
-        f"user_intent = {json.dumps(user_intent, indent=2)}\n"
+        f"user_intent = {json.dumps({k: user_intent.get(k) for k in HOTEL_INTENT_FIELDS}, indent=2)}\n"
         f"venues = {json.dumps(venues[:2], indent=2)}"
         "IMPORTANT: Respond immediately with the final JSON object using only `Final Answer:` followed by the valid JSON. Do NOT output thoughts, actions, or any reasoning."
     )
-    response = agent.run(prompt)
+    response = agent.run_structured(prompt)
     return extract_json_from_response(response.final_answer)
 
+# 🏨 Radius (meters) for hotels around a venue
+HOTEL_SEARCH_RADIUS = 3000
+
 # ✅ Google API helpers
-def get_place_details(place_id):
-    url = "https://maps.googleapis.com/maps/api/place/details/json"
-    params = {
-        "place_id": place_id,
-        "fields": "name,rating,formatted_address,formatted_phone_number,website",
-        "key": GOOGLE_API_KEY
+def hotel_entry(place, details, distance=None):
+    hotel = {
+        "name": details.name or place.name,
+        "rating": details.rating or "N/A",
+        "address": details.address or place.address or "",
+        "phone": details.phone or "N/A",
+        "website": details.website or "N/A"
     }
-    return requests.get(url, params=params).json().get("result", {})
+    if distance is not None:
+        hotel["distance_m"] = round(distance)
+    return hotel
 
 def search_hotels_near_venue(venue_address, hotel_type, limit=3):
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    params = {
-        "query": f"{hotel_type} hotel near {venue_address}",
-        "key": GOOGLE_API_KEY
-    }
-    res = requests.get(url, params=params).json()
-    results = res.get("results", [])[:limit]
-
-    hotels = []
-    for r in results:
-        details = get_place_details(r.get("place_id", ""))
-        hotels.append({
-            "name": details.get("name", r.get("name")),
-            "rating": details.get("rating", "N/A"),
-            "address": details.get("formatted_address", r.get("formatted_address", "")),
-            "phone": details.get("formatted_phone_number", "N/A"),
-            "website": details.get("website", "N/A")
-        })
-
-    return hotels
+    results = get_places_client().search_details(f"{hotel_type} hotel near {venue_address}", limit)
+    return [hotel_entry(place, details) for place, details in results]
+
+def search_hotels_near_venues(venues, hotel_type, limit=3):
+    """
+    Hotels for several venues: one nearby search per spatial cluster of
+    venues, each hotel assigned to the venues it is close to (nearest first).
+    The hotel type (e.g. "5-star") is the search keyword; venues without a
+    known location or without a match nearby fall back to a text search for
+    "<hotel type> hotel near <venue>", so the type is honoured either way.
+    """
+    places = get_places_client()
+    coordinates = map_concurrent(places.locate, venues)
+    located = [i for i, point in enumerate(coordinates) if point]
+    nearby = places.nearby_search_many([coordinates[i] for i in located], radius=HOTEL_SEARCH_RADIUS,
+                                       place_type="lodging", keyword=hotel_type, limit=limit)
+
+    # Details once per distinct hotel, however many venues it serves
+    hit_ids = list(dict.fromkeys(place.place_id or "" for hits in nearby for place, _ in hits))
+    details = dict(zip(hit_ids, places.details_many(hit_ids)))
+
+    results = [None] * len(venues)
+    for i, hits in zip(located, nearby):
+        if hits:
+            results[i] = [hotel_entry(place, details[place.place_id or ""], distance) for place, distance in hits]
+
+    missing = [i for i, hotels in enumerate(results) if hotels is None]
+    fallback = map_concurrent(
+        lambda i: search_hotels_near_venue(venues[i].get("address") or venues[i].get("formatted_address"), hotel_type, limit),
+        missing)
+    for i, hotels in zip(missing, fallback):
+        results[i] = hotels
+    return results
 
 # ✅ Main hotel booking agent
 def hotel_booking_agent(user_intent, venue_data):
@@ -98,16 +120,11 @@ def hotel_booking_agent(user_intent, venue_data):
     room_requirements = hotel_plan.get("room_requirements", {})
     priorities = hotel_plan.get("priorities", [])
 
-    # 🔎 Search near each venue
-    recommendations = {}
-    for venue in all_venues:
-        venue_name = venue.get("name")
-        venue_address = venue.get("address") or venue.get("formatted_address")
-        if not venue_name or not venue_address:
-            continue
-
-        hotels = search_hotels_near_venue(venue_address, hotel_type)
-        recommendations[venue_name] = hotels
+    # 🔎 Search near the venues (one search per cluster of nearby venues)
+    targets = [venue for venue in all_venues
+               if venue.get("name") and (venue.get("address") or venue.get("formatted_address"))]
+    results = search_hotels_near_venues(targets, hotel_type)
+    recommendations = {venue["name"]: hotels for venue, hotels in zip(targets, results)}
 
     return {
         "hotel_type": hotel_type,
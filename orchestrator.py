@@ -1,7 +1,21 @@
 import sys
 import json
-from agentpro import ReactAgent, create_model
+import uuid
+from dataclasses import replace
+from agentpro import ReactAgent, create_model, get_response_cache, get_router, get_usage_tracker, usage_tags
 import os
+from google_places import get_places_client
+from plan_executor import NodeResult, PlanExecutor, PlanNode, format_timings
+from summarizer import build_section_prompt, summarize_sections
+from venue_select_agent import venue_agent
+from vendor_selector_agent import vendors_agent
+from schedular_agent import scheduler_agent
+from transport_and_parking_agent import transport_parking_agent, TRANSPORT_INTENT_FIELDS
+from hotel_booking_agent import hotel_booking_agent, HOTEL_INTENT_FIELDS
+from site_seeing_agent import sightseeing_agent
+from catering_agent import catering_agent
+from event_theme_agent import theme_agent, THEME_INTENT_FIELDS
+from weather_predictor_agent import weather_predictor_agent
 #from user_intent_agent import extract_user_intent
 
 # ✅ OpenAI model setup
@@ -11,36 +25,153 @@ assert OPENAI_API_KEY, "❌ Missing OPENAI_API_KEY in environment"
 model = create_model(provider="openai", model_name="gpt-4o", api_key=OPENAI_API_KEY)
 agent = ReactAgent(model=model, tools=[])
 
-import json
-import ast
 def summarize_output(section_name, data):
-    prompt = (
-        f"You are a summarizer for an event planner agent.\n"
-        f"Please summarize the key information from the '{section_name}' section in bullet points, focusing on top recommended options only.\n\n"
-        f"{section_name} data:\n{json.dumps(data, indent=2)}\n\n"
-        "IMPORTANT: Respond immediately with the final JSON object using only `Final Answer:` followed by the valid JSON. "
-        "Do NOT output thoughts, actions, or any reasoning."
-    )
-
-    print(f"\n📦 Summarizing section: {section_name}")
-    response = agent.run(prompt)
-
-    if not hasattr(response, "final_answer") or not response.final_answer.strip().startswith("{"):
-        raise ValueError(f"❌ LLM did not return usable JSON. Raw output:\n{response.final_answer}")
-    
-    return extract_json_from_response(response.final_answer)
+    return agent.run_structured(build_section_prompt(section_name, data)).final_answer
 
-def summarize_output(section_name, data):
-    prompt = (
-        f"You are a summarizer for an event planner agent.\n"
-        f"Return only a valid JSON object with no code block markers, no explanation, no markdown, no labels — just the raw JSON."
-        f"Please summarize the key information from the '{section_name}' section in bullet points, focusing on top recommended options only.\n\n"
-        f"{section_name} data:\n{json.dumps(data, indent=2)}"
-        "IMPORTANT: In each sub agent, Respond immediately with the final JSON object using only `Final Answer:` followed by the valid JSON. Do NOT output thoughts, actions, or any reasoning."
+# ✅ Send several summary prompts at once; failed prompts come back as None
+def ask_many(prompts):
+    results = get_router().client_for("summarize").batch_chat_completion(
+        [("You are a summarizer for an event planner agent. Answer with JSON only.", prompt) for prompt in prompts]
     )
-    return agent.run(prompt).final_answer
+    for result in results:
+        if not result.ok:
+            print(f"⚠️ Summary prompt failed: {result.error}")
+    return [result.content for result in results]
+
+# ⏱️ Whole-plan deadline in seconds; sections still running by then are marked degraded
+PLAN_DEADLINE = 240
+
+# 🧩 Agent dependency graph: each node lists the values it is called with,
+# the intent fields it reads (so edits only rerun the agents they affect)
+# and its time budget in seconds. Agents whose prompts pick intent fields
+# export that list (*_INTENT_FIELDS) so it stays in sync with the prompt.
+AGENT_NODES = [
+    PlanNode("venues", venue_agent, ["intent"], fields=["event_type", "location"], timeout=60),
+    PlanNode("vendors", vendors_agent, ["intent"], fields=["event_type", "location"], timeout=90),
+    PlanNode("schedule", scheduler_agent, ["intent"], fields=["event_type", "event_date", "guest_count"], timeout=45),
+    PlanNode("transportation", transport_parking_agent, ["intent", "venues", "schedule"], fields=TRANSPORT_INTENT_FIELDS, timeout=90),
+    PlanNode("hotels", hotel_booking_agent, ["intent", "venues"], fields=HOTEL_INTENT_FIELDS, timeout=90),
+    PlanNode("sightseeing", sightseeing_agent, ["intent", "schedule"], fields=["event_type", "location"], timeout=60),
+    PlanNode("catering", catering_agent, ["intent", "schedule"], fields=["event_type", "location"], timeout=90),
+    PlanNode("theme", theme_agent, ["intent"], fields=THEME_INTENT_FIELDS, timeout=90),
+    PlanNode("weather_forecast", weather_predictor_agent, ["intent", "schedule"], fields=["location", "event_date"], timeout=30),
+]
+
+# Sections that get an LLM summary, with the title used in the summarizer prompt
+SUMMARY_SECTIONS = {
+    "venues": "Venues",
+    "vendors": "Vendors",
+    "transportation": "Transportation",
+    "hotels": "Hotels",
+    "sightseeing": "Sightseeing",
+    "catering": "Catering",
+    "theme": "Theme",
+}
+
+def summarize_all(*sections, reuse=None):
+    """
+    Summarize every section in one batched model call.
+    Sections present in `reuse` keep their earlier summary and are not sent;
+    degraded sections (None) get no summary.
+    """
+    reuse = reuse or {}
+    data = {key: section for key, section in zip(SUMMARY_SECTIONS, sections)
+            if key not in reuse and section is not None}
+    summaries = summarize_sections(
+        data,
+        ask=lambda prompt: agent.run_structured(prompt).final_answer,
+        summarize_one=lambda key, section: summarize_output(SUMMARY_SECTIONS[key], section),
+        ask_many=ask_many,
+    ) if data else {}
+    return {key: reuse[key] if key in reuse else summaries.get(key) for key in SUMMARY_SECTIONS}
+
+# ✅ Tag every model call a node makes with the agent name and plan id (for usage accounting)
+def tagged(node, plan_id):
+    def run(*args):
+        with usage_tags(agent=node.name, plan_id=plan_id):
+            return node.func(*args)
+    return replace(node, func=run)
+
+def plan_graph(max_workers=8, reuse_summaries=None, plan_id=None):
+    summarize = lambda *sections: summarize_all(*sections, reuse=reuse_summaries)
+    summary_node = PlanNode("summary", summarize, list(SUMMARY_SECTIONS), timeout=60, tolerate_degraded=True)
+    nodes = AGENT_NODES + [summary_node]
+    if plan_id:
+        nodes = [tagged(node, plan_id) for node in nodes]
+    return PlanExecutor(nodes, max_workers=max_workers)
+
+def new_plan_id():
+    return uuid.uuid4().hex[:12]
+
+def reusable_results(previous_plan, user_intent):
+    """
+    Node outputs (and section summaries) from `previous_plan` whose inputs are
+    unchanged under the new intent. Degraded sections are never reused.
+    """
+    fingerprints = plan_graph().fingerprints({"intent": user_intent})
+    previous_fingerprints = previous_plan.get("fingerprints", {})
+    previously_degraded = previous_plan.get("degraded", {})
+    unchanged = {name for name, fp in fingerprints.items()
+                 if previous_fingerprints.get(name) == fp and name not in previously_degraded}
+
+    cached = {name: value for name, value in previous_plan["details"].items() if name in unchanged}
+    summaries = {key: value for key, value in previous_plan["summary"].items() if key in unchanged}
+    if "summary" in unchanged and not previously_degraded:
+        cached["summary"] = previous_plan["summary"]
+    return cached, summaries
+
+def iter_event_plan(user_intent, max_workers=8, previous_plan=None, deadline=PLAN_DEADLINE, plan_id=None):
+    """
+    Yield a NodeResult for each plan section as soon as it completes, so UIs
+    can render partial plans. The batched "summary" result always comes last.
+
+    With `previous_plan`, sections whose inputs did not change are yielded
+    first (marked `reused`) and only the affected agents are rerun.
+    Agents that overrun their budget or the `deadline` (seconds) are yielded
+    as degraded results instead of stalling the plan. Model usage is tagged
+    with `plan_id` (see build_event_plan).
+    """
+    cached, reuse_summaries = {}, {}
+    if previous_plan:
+        cached, reuse_summaries = reusable_results(previous_plan, user_intent)
+        print(f"♻️ Reusing {len(cached)} unchanged sections: {', '.join(cached) or 'none'}")
+        for name, value in cached.items():
+            if name != "summary":
+                yield NodeResult(name=name, value=value, reused=True)
+
+    executor = plan_graph(max_workers, reuse_summaries, plan_id)
+    for result in executor.iter_results({"intent": user_intent}, cached=cached, deadline=deadline):
+        if not result.degraded:
+            print(f"⏱️ {result.name} finished in {result.duration:.2f}s")
+        yield result
+
+    if "summary" in cached:
+        yield NodeResult(name="summary", value=cached["summary"], reused=True)
+
+def build_event_plan(user_intent, results, plan_id=None):
+    """
+    Assemble the final event plan dict from NodeResults keyed by node name.
+    With the `plan_id` the results were produced under, token/time/cost
+    usage per agent is included.
+    """
+    return {
+        "plan_id": plan_id,
+        "intent": user_intent,
+        "summary": results["summary"].value or {},
+        "details": {node.name: results[node.name].value for node in AGENT_NODES},
+        "timings": format_timings(results),
+        "degraded": {name: r.error for name, r in results.items() if r.degraded},
+        "fingerprints": plan_graph().fingerprints({"intent": user_intent}),
+        "usage": get_usage_tracker().totals(by="agent", plan_id=plan_id) if plan_id else None,
+    }
 
-def orchestrated_event_plan(user_intent):
+def orchestrated_event_plan(user_intent, max_workers=8, previous_plan=None, deadline=PLAN_DEADLINE):
+    """
+    Plan the whole event. Pass the plan returned by an earlier call as
+    `previous_plan` to only recompute the sections affected by intent edits.
+    The plan returns within roughly `deadline` seconds; sections that did not
+    finish in time are None in "details" and listed under "degraded".
+    """
     print("\n🚀 Launching Orchestrator Agent...")
 
     # 1. Extract User Intent
@@ -50,65 +181,22 @@ def orchestrated_event_plan(user_intent):
     print("\n🎯 User Intent:")
     print(json.dumps(user_intent, indent=2))
 
-    # 2. Venue Options
-    venue_results = venue_agent(user_intent)
-    venue_summary = summarize_output("Venues", venue_results)
-
-    # 3. Vendor Recommendations
-    vendor_results = vendors_agent(user_intent)
-    vendor_summary = summarize_output("Vendors", vendor_results)
-
-    # 4. Event Schedule
-    schedule = scheduler_agent(user_intent)
-
-    # 5. Transport & Parking
-    transport_output = transport_parking_agent(user_intent, venue_results, schedule)
-    transport_summary = summarize_output("Transportation", transport_output)
-
-    # 6. Hotel Options
-    hotel_output = hotel_booking_agent(user_intent, venue_results)
-    hotel_summary = summarize_output("Hotels", hotel_output)
-
-    # 7. Sightseeing Plan
-    sightseeing = sightseeing_agent(user_intent, schedule)
-    sightseeing_summary = summarize_output("Sightseeing", sightseeing)
-
-    # 8. Catering Options
-    catering_result = catering_agent(user_intent, schedule)
-    catering_summary = summarize_output("Catering", catering_result)
-
-    # 9. Theme Plan
-    theme_output = theme_agent(user_intent)
-    theme_summary = summarize_output("Theme", theme_output)
-
-    # 10. Weather Forecast
-    forecast = weather_predictor_agent(user_intent, schedule)
+    # 2. Run all agents as soon as their inputs are ready, then summarize them together
+    plan_id = new_plan_id()
+    results = {result.name: result
+               for result in iter_event_plan(user_intent, max_workers, previous_plan, deadline, plan_id)}
 
     # 🧠 Final Output Structure
-    event_plan = {
-        "intent": user_intent,
-        "summary": {
-            "venues": venue_summary,
-            "vendors": vendor_summary,
-            "transportation": transport_summary,
-            "hotels": hotel_summary,
-            "sightseeing": sightseeing_summary,
-            "catering": catering_summary,
-            "theme": theme_summary,
-        },
-        "details": {
-            "venues": venue_results,
-            "vendors": vendor_results,
-            "schedule": schedule,
-            "transportation": transport_output,
-            "hotels": hotel_output,
-            "sightseeing": sightseeing,
-            "catering": catering_result,
-            "theme": theme_output,
-            "weather_forecast": forecast,
-        }
-    }
-
+    event_plan = build_event_plan(user_intent, results, plan_id)
+
+    if event_plan["degraded"]:
+        print(f"\n⚠️ Degraded sections: {', '.join(event_plan['degraded'])}")
+    print(f"💾 LLM response cache: {get_response_cache().stats()}")
+    print(f"🚦 {model.model_name} rate limiter: {model.limiter.stats()}")
+    print(f"📍 Google Places: {get_places_client().stats()}")
+    print(f"🧭 Model tiers: { {tier: s['attempts'] for tier, s in get_router().stats().items()} } attempts")
+    usage = event_plan["usage"]
+    print(f"💰 Plan usage: {usage['total_tokens']} tokens, {usage['calls']} calls, ${usage['cost_usd']:.4f}")
     print("\n✅ Event Planning Complete!")
     return event_plan
 
@@ -0,0 +1,256 @@
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# ✅ A single unit of work in the event plan graph
+@dataclass
+class PlanNode:
+    """
+    One agent (or post-processing step) in the plan graph.
+
+    `inputs` names the values passed positionally to `func`: either seed values
+    given to the executor (e.g. "intent") or the names of other nodes.
+    `fields` lists the keys the node actually reads from dict seeds; when set,
+    changes to other keys do not invalidate the node's cached output.
+    `timeout` is the node's time budget in seconds; an overrunning node is
+    abandoned and reported as degraded, and so is a node that raises (e.g. a
+    request or model timeout inside the agent). Nodes with `tolerate_degraded` still
+    run when an input is degraded and receive None for it; other dependents
+    of a degraded node are skipped and degraded as well.
+    """
+    name: str
+    func: Callable[..., Any]
+    inputs: List[str] = field(default_factory=list)
+    fields: Optional[List[str]] = None
+    timeout: Optional[float] = None
+    tolerate_degraded: bool = False
+
+# ✅ Outcome of running one node, with timings relative to plan start
+@dataclass
+class NodeResult:
+    name: str
+    value: Any = None
+    started: float = 0.0
+    finished: float = 0.0
+    reused: bool = False
+    degraded: bool = False
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+    def timing(self) -> Dict[str, float]:
+        return {
+            "start": round(self.started, 3),
+            "end": round(self.finished, 3),
+            "duration": round(self.duration, 3),
+            "reused": self.reused,
+            "degraded": self.degraded,
+        }
+
+class PlanExecutor:
+    """
+    Runs a DAG of PlanNodes on background threads, at most `max_workers` at once.
+
+    A node is started as soon as all of its inputs are available, so the
+    wall-clock time of a plan is set by its critical path instead of the sum
+    of all agents. Most agents spend their time waiting on OpenAI and Google
+    APIs, which is why threads are enough here.
+
+    Python threads cannot be killed, so a node that overruns its budget (or
+    the plan deadline) is abandoned: its daemon thread finishes in the
+    background, its result is discarded and its slot is freed immediately.
+    """
+    def __init__(self, nodes: List[PlanNode], max_workers: int = 8):
+        self.nodes = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"❌ Duplicate plan node: {node.name}")
+            self.nodes[node.name] = node
+        self.max_workers = max_workers
+
+    def _check_inputs(self, seeds: Dict[str, Any]):
+        for node in self.nodes.values():
+            for name in node.inputs:
+                if name not in self.nodes and name not in seeds:
+                    raise ValueError(f"❌ Plan node '{node.name}' depends on unknown input '{name}'")
+
+    @classmethod
+    def _start(cls, node: PlanNode, args: List[Any], origin: float) -> Future:
+        future = Future()
+        context = contextvars.copy_context()  # Context variables (e.g. usage tags) follow the node
+
+        def target():
+            if not future.set_running_or_notify_cancel():
+                return
+            started = time.perf_counter() - origin
+            try:
+                value = context.run(node.func, *args)
+                finished = time.perf_counter() - origin
+                future.set_result(NodeResult(name=node.name, value=value, started=started, finished=finished))
+            except Exception as e:
+                # A failing agent degrades its section instead of aborting the plan
+                reason = f"{type(e).__name__}: {e}"
+                future.set_result(cls._degraded(node.name, reason, started, time.perf_counter() - origin))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=target, name=f"plan-{node.name}", daemon=True).start()
+        return future
+
+    @staticmethod
+    def _degraded(name: str, reason: str, started: float, finished: float) -> NodeResult:
+        print(f"⚠️ {name} degraded: {reason}")
+        return NodeResult(name=name, started=started, finished=finished, degraded=True, error=reason)
+
+    def fingerprints(self, seeds: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Fingerprint of every node's inputs, without running anything.
+
+        A node's fingerprint covers the seed fields it reads and the
+        fingerprints of its upstream nodes, so it changes exactly when the
+        node (or something it depends on) needs to be recomputed.
+        """
+        self._check_inputs(seeds)
+        result: Dict[str, str] = {}
+
+        def visit(name, path=()):
+            if name in result:
+                return result[name]
+            if name in path:
+                raise ValueError(f"❌ Plan graph has a cycle between: {', '.join(path)}")
+            node = self.nodes[name]
+            parts = []
+            for input_name in node.inputs:
+                if input_name in self.nodes:
+                    parts.append(visit(input_name, path + (name,)))
+                    continue
+                value = seeds[input_name]
+                if node.fields is not None and isinstance(value, dict):
+                    value = {key: value.get(key) for key in node.fields}
+                parts.append(fingerprint(value))
+            result[name] = fingerprint([name, parts])
+            return result[name]
+
+        for name in self.nodes:
+            visit(name)
+        return result
+
+    def required_nodes(self, targets: List[str], cached: Dict[str, Any]) -> List[str]:
+        """Names of the nodes that must run to produce `targets`, given `cached` outputs."""
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed or name in cached or name not in self.nodes:
+                continue
+            needed.add(name)
+            stack.extend(self.nodes[name].inputs)
+        return [name for name in self.nodes if name in needed]
+
+    def iter_results(self, seeds: Dict[str, Any], targets: Optional[List[str]] = None,
+                     cached: Optional[Dict[str, Any]] = None,
+                     deadline: Optional[float] = None) -> Iterator[NodeResult]:
+        """
+        Run the graph and yield each NodeResult as soon as it completes.
+
+        `cached` holds node outputs from an earlier run; those nodes are not
+        re-run. If `targets` is given, only the nodes needed for them are run.
+        `deadline` bounds the whole run in seconds: whatever has not finished
+        by then is yielded as degraded, as is a node that raises an exception;
+        dependents of degraded nodes are skipped (or get None if they tolerate it).
+        """
+        cached = cached or {}
+        self._check_inputs({**seeds, **cached})
+        values = {**seeds, **cached}
+        names = self.required_nodes(targets if targets is not None else list(self.nodes), cached)
+        pending = {name: self.nodes[name] for name in names}
+        running: Dict[Future, PlanNode] = {}
+        started_at: Dict[str, float] = {}
+        degraded = set()
+        origin = time.perf_counter()
+        deadline_at = origin + deadline if deadline is not None else None
+
+        while pending or running:
+            # Start (or skip) every node whose inputs are settled, within the worker limit
+            progressed = True
+            while progressed:
+                progressed = False
+                for node in list(pending.values()):
+                    if len(running) >= self.max_workers:
+                        break
+                    if not all(i in values or i in degraded for i in node.inputs):
+                        continue
+                    del pending[node.name]
+                    progressed = True
+                    upstream = [i for i in node.inputs if i in degraded]
+                    if upstream and not node.tolerate_degraded:
+                        degraded.add(node.name)
+                        now = time.perf_counter() - origin
+                        yield self._degraded(node.name, f"upstream degraded: {', '.join(upstream)}", now, now)
+                        continue
+                    args = [values.get(i) for i in node.inputs]
+                    started_at[node.name] = time.perf_counter()
+                    running[self._start(node, args, origin)] = node
+
+            if not running:
+                if pending:
+                    raise ValueError(f"❌ Plan graph has a cycle between: {', '.join(pending)}")
+                break
+
+            # Sleep until something finishes or the earliest budget/deadline expires
+            expiries = [started_at[n.name] + n.timeout for n in running.values() if n.timeout is not None]
+            if deadline_at is not None:
+                expiries.append(deadline_at)
+            timeout = max(0.0, min(expiries) - time.perf_counter()) if expiries else None
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                del running[future]
+                result = future.result()
+                if result.degraded:
+                    degraded.add(result.name)
+                else:
+                    values[result.name] = result.value
+                yield result
+
+            now = time.perf_counter()
+            past_deadline = deadline_at is not None and now >= deadline_at
+            for future, node in list(running.items()):
+                if past_deadline:
+                    reason = "plan deadline exceeded"
+                elif node.timeout is not None and now - started_at[node.name] >= node.timeout:
+                    reason = f"exceeded {node.timeout:g}s budget"
+                else:
+                    continue
+                future.cancel()
+                del running[future]
+                degraded.add(node.name)
+                yield self._degraded(node.name, reason, started_at[node.name] - origin, now - origin)
+
+            if past_deadline:
+                for name in list(pending):
+                    del pending[name]
+                    degraded.add(name)
+                    yield self._degraded(name, "plan deadline exceeded", now - origin, now - origin)
+
+    def run(self, seeds: Dict[str, Any], targets: Optional[List[str]] = None,
+            cached: Optional[Dict[str, Any]] = None,
+            deadline: Optional[float] = None) -> Dict[str, NodeResult]:
+        """Run the graph and return the new results keyed by node name."""
+        return {result.name: result for result in self.iter_results(seeds, targets, cached, deadline)}
+
+def format_timings(results: Dict[str, NodeResult]) -> Dict[str, Dict[str, float]]:
+    """Per-node timing report, ordered by start time."""
+    ordered = sorted(results.values(), key=lambda r: r.started)
+    return {r.name: r.timing() for r in ordered}
+
+def fingerprint(value: Any) -> str:
+    """Stable hash of a JSON-serializable value (e.g. a user intent)."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
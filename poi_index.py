@@ -0,0 +1,272 @@
+"""
+Local store of Places results with a spatial index, so "nearest N places of
+type T to point P" can be answered in-process.
+
+The Places gateway adds every Text Search / Nearby Search result it sees
+(live or cached) here. Queries run on a per-type grid over NumPy coordinate
+arrays, and the gateway only goes to the network when local coverage is
+insufficient.
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_000
+METERS_PER_DEGREE = 111_320
+
+# Grid cell size in degrees (0.01 ≈ 1.1 km of latitude)
+DEFAULT_CELL_DEG = 0.01
+
+# Places kept in memory; the oldest are dropped beyond this
+POI_MAX_PLACES = int(os.environ.get("PLACES_POI_MAX_PLACES", "100000"))
+
+# Nearby Search returns at most this many results; a full page may have left places out
+NEARBY_PAGE_SIZE = 20
+
+def haversine_m(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Distances in meters from one point to arrays of points."""
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    h = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+class _Grid:
+    """
+    Incremental grid over the coordinates of one place type. Places are
+    appended to growable NumPy arrays and bucketed by cell; removed rows are
+    tombstoned and compacted away once they make up half of the arrays.
+    """
+    def __init__(self, cell_deg: float):
+        self.cell_deg = cell_deg
+        self.places: List[Any] = []
+        self.lats = np.empty(64, dtype=np.float64)
+        self.lngs = np.empty(64, dtype=np.float64)
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.rows: Dict[str, int] = {}  # place_id -> row
+        self.removed = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def add(self, place: Any):
+        row = len(self.places)
+        if row == len(self.lats):
+            self.lats = np.resize(self.lats, 2 * row)
+            self.lngs = np.resize(self.lngs, 2 * row)
+        self.places.append(place)
+        self.lats[row], self.lngs[row] = place.lat, place.lng
+        self.cells.setdefault(self._cell(place.lat, place.lng), []).append(row)
+        self.rows[place.place_id] = row
+
+    def remove(self, place_id: str):
+        row = self.rows.pop(place_id, None)
+        if row is None:
+            return
+        cell = self._cell(self.lats[row], self.lngs[row])
+        self.cells[cell].remove(row)
+        if not self.cells[cell]:
+            del self.cells[cell]
+        self.places[row] = None
+        self.removed += 1
+        if self.removed * 2 > len(self.places):
+            alive = [place for place in self.places if place is not None]
+            self.__init__(self.cell_deg)
+            for place in alive:
+                self.add(place)
+
+    def within(self, lat: float, lng: float, radius_m: float) -> List[Tuple[Any, float]]:
+        if not self.rows:
+            return []
+        dlat = radius_m / METERS_PER_DEGREE
+        dlng = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        lat_cells = range(math.floor((lat - dlat) / self.cell_deg), math.floor((lat + dlat) / self.cell_deg) + 1)
+        lng_cells = range(math.floor((lng - dlng) / self.cell_deg), math.floor((lng + dlng) / self.cell_deg) + 1)
+        if len(lat_cells) * len(lng_cells) > len(self.cells):
+            rows = np.fromiter(self.rows.values(), dtype=np.int64)  # Huge radius: scanning everything is cheaper
+        else:
+            rows = np.array([row for i in lat_cells for j in lng_cells for row in self.cells.get((i, j), ())],
+                            dtype=np.int64)
+            if not len(rows):
+                return []
+        distances = haversine_m(lat, lng, self.lats[rows], self.lngs[rows])
+        keep = distances <= radius_m
+        rows, distances = rows[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return [(self.places[row], float(distance)) for row, distance in zip(rows[order], distances[order])]
+
+class _Areas:
+    """Covered areas for one (type, keyword), as arrays for a vectorized containment test."""
+    def __init__(self):
+        self.entries: Dict[Tuple[float, float, float], float] = {}  # (lat, lng, radius) -> created
+        self._arrays: Optional[Tuple[np.ndarray, ...]] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, lat: float, lng: float, radius_m: float, created: float):
+        key = (round(lat, 5), round(lng, 5), float(radius_m))
+        if created > self.entries.get(key, float("-inf")):
+            self.entries[key] = created
+            self._arrays = None
+
+    def contains(self, lat: float, lng: float, radius_m: float, oldest: float = float("-inf")) -> bool:
+        """Whether an area searched at or after `oldest` contains the circle; older areas are dropped."""
+        if not self.entries:
+            return False
+        if self._arrays is None:
+            table = np.array([(*key, created) for key, created in self.entries.items()], dtype=np.float64)
+            self._arrays = (table[:, 0], table[:, 1], table[:, 2], table[:, 3])
+        lats, lngs, radii, created = self._arrays
+        fresh = created >= oldest
+        if not fresh.all():
+            self.entries = {key: c for key, c in self.entries.items() if c >= oldest}
+            self._arrays = None
+            lats, lngs, radii = lats[fresh], lngs[fresh], radii[fresh]
+        return bool(np.any(haversine_m(lat, lng, lats, lngs) + radius_m <= radii))
+
+class POIIndex:
+    """
+    Thread-safe, in-process index of places (anything with place_id, lat,
+    lng and types) for radius and k-nearest queries by type.
+
+    Grids are kept per type and updated in place, so re-adding places that
+    are already known (e.g. from cache hits) costs a dict lookup each.
+    With a `ttl`, places and covered areas stop being used (and are dropped)
+    `ttl` seconds after the search that returned them.
+    """
+    def __init__(self, cell_deg: float = DEFAULT_CELL_DEG, max_places: int = POI_MAX_PLACES,
+                 ttl: Optional[float] = None):
+        self.cell_deg = cell_deg
+        self.max_places = max_places
+        self.ttl = ttl
+        self._places: "OrderedDict[str, Any]" = OrderedDict()
+        self._created: Dict[str, float] = {}
+        self._grids: Dict[Optional[str], _Grid] = {None: _Grid(cell_deg)}  # None: all types
+        self._areas: Dict[Tuple[Optional[str], str], _Areas] = {}
+        self._lock = threading.Lock()
+        self._metrics = {"local_hits": 0, "misses": 0}
+
+    def _insert(self, place: Any):
+        for place_type in [None, *set(place.types or [])]:
+            grid = self._grids.get(place_type)
+            if grid is None:
+                grid = self._grids[place_type] = _Grid(self.cell_deg)
+            grid.add(place)
+
+    def _drop(self, place: Any):
+        for place_type in [None, *set(place.types or [])]:
+            self._grids[place_type].remove(place.place_id)
+
+    def _forget(self, place_id: str):
+        self._created.pop(place_id, None)
+        self._drop(self._places.pop(place_id))
+
+    def _oldest(self) -> float:
+        return time.time() - self.ttl if self.ttl is not None else float("-inf")
+
+    def add(self, places: Iterable[Any], created: Optional[float] = None):
+        """Add search results; `created` is when they were fetched (default: now)."""
+        created = created if created is not None else time.time()
+        with self._lock:
+            for place in places:
+                if not place.place_id or place.lat is None or place.lng is None:
+                    continue
+                known = self._places.get(place.place_id)
+                if known is not None:
+                    self._places.move_to_end(place.place_id)
+                    self._created[place.place_id] = max(self._created[place.place_id], created)
+                    if (known.lat, known.lng, known.types) == (place.lat, place.lng, place.types):
+                        continue
+                    self._drop(known)
+                else:
+                    self._created[place.place_id] = created
+                self._places[place.place_id] = place
+                self._insert(place)
+            while len(self._places) > self.max_places:
+                self._forget(next(iter(self._places)))
+
+    def add_coverage(self, lat: float, lng: float, radius_m: float, place_type: Optional[str],
+                     keyword: str = "", result_count: int = 0, created: Optional[float] = None):
+        """Record a Nearby Search area; only searches that returned less than a full page cover it."""
+        if result_count >= NEARBY_PAGE_SIZE:
+            return
+        created = created if created is not None else time.time()
+        with self._lock:
+            self._areas.setdefault((place_type, keyword), _Areas()).add(lat, lng, radius_m, created)
+
+    def _fresh(self, hits: List[Tuple[Any, float]]) -> List[Tuple[Any, float]]:
+        # Drops expired places from the index as they turn up in results
+        if self.ttl is None:
+            return hits
+        oldest = self._oldest()
+        fresh = [hit for hit in hits if self._created[hit[0].place_id] >= oldest]
+        if len(fresh) < len(hits):
+            for place, _ in hits:
+                if self._created[place.place_id] < oldest:
+                    self._forget(place.place_id)
+        return fresh
+
+    def _within(self, lat: float, lng: float, radius_m: float, place_type: Optional[str]) -> List[Tuple[Any, float]]:
+        grid = self._grids.get(place_type)
+        return self._fresh(grid.within(lat, lng, radius_m)) if grid is not None else []
+
+    def within(self, lat: float, lng: float, radius_m: float,
+               place_type: Optional[str] = None) -> List[Tuple[Any, float]]:
+        """Places of `place_type` within `radius_m` of the point, nearest first, as (place, meters)."""
+        with self._lock:
+            return self._within(lat, lng, radius_m, place_type)
+
+    def _nearest(self, lat: float, lng: float, k: int, place_type: Optional[str],
+                 max_distance_m: float) -> List[Tuple[Any, float]]:
+        radius = self.cell_deg * METERS_PER_DEGREE
+        while True:
+            radius = min(radius, max_distance_m)
+            hits = self._within(lat, lng, radius, place_type)
+            # Everything within `radius` is found, so once k are in it they are the k nearest
+            if len(hits) >= k or radius >= max_distance_m or len(hits) == len(self._grids.get(place_type) or ()):
+                return hits[:k]
+            radius *= 4
+
+    def nearest(self, lat: float, lng: float, k: int, place_type: Optional[str] = None,
+                max_distance_m: float = float("inf")) -> List[Tuple[Any, float]]:
+        """The k nearest places of `place_type` (no farther than `max_distance_m`), nearest first."""
+        with self._lock:
+            return self._nearest(lat, lng, k, place_type, max_distance_m)
+
+    def covered(self, lat: float, lng: float, radius_m: float, place_type: Optional[str], keyword: str = "") -> bool:
+        with self._lock:
+            areas = self._areas.get((place_type, keyword))
+            return areas is not None and areas.contains(lat, lng, radius_m, self._oldest())
+
+    def query(self, lat: float, lng: float, radius_m: float, place_type: Optional[str] = None,
+              keyword: str = "", limit: Optional[int] = None) -> Optional[List[Tuple[Any, float]]]:
+        """
+        Local answer to a nearby search, or None when the network is needed.
+        An answer is only trusted when the area was fully searched before for
+        the same type and keyword; places merely known from other searches
+        need not be the nearest ones.
+        """
+        with self._lock:
+            hits = None
+            areas = self._areas.get((place_type, keyword))
+            if areas is not None and areas.contains(lat, lng, radius_m, self._oldest()):
+                hits = self._within(lat, lng, radius_m, place_type)[:limit]
+            self._metrics["local_hits" if hits is not None else "misses"] += 1
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["places"] = len(self._places)
+            metrics["covered_areas"] = sum(len(areas) for areas in self._areas.values())
+        lookups = metrics["local_hits"] + metrics["misses"]
+        metrics["hit_rate"] = round(metrics["local_hits"] / lookups, 3) if lookups else 0.0
+        return metrics
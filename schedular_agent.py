@@ -17,6 +17,19 @@ model = create_model(
 
 agent = ReactAgent(model=model, tools=[])
 
+# JSON schema for the schedule, used by the structured single-shot request
+SCHEDULE_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "day": {"type": "string"},
+            "activities": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["day", "activities"]
+    }
+}
+
 # 📦 Extract structured list from LLM output
 def extract_json_from_response(response):
     cleaned = response.strip()
@@ -58,7 +71,7 @@ def scheduler_agent(user_intent):
     )
 
     print("🧠 Prompting GPT-4o for schedule...")
-    response = agent.run(prompt).final_answer
+    response = agent.run_structured(prompt, schema=SCHEDULE_SCHEMA).final_answer
     schedule = extract_json_from_response(response)
     return schedule
 
@@ -3,16 +3,14 @@ import json
 import ast
 import re
 import requests
-from agentpro import ReactAgent, create_model
+from agentpro import get_response_cache, get_router
+from agentpro.model import JSON_ONLY_SYSTEM_PROMPT
+from google_places import get_places_client
 
 # ✅ Use OpenAI API Key from environment
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 assert OPENAI_API_KEY, "❌ Missing OPENAI_API_KEY in environment"
 
-# ✅ Create ReAct Agent using GPT-4o
-model = create_model(provider="openai", model_name="gpt-4o", api_key=OPENAI_API_KEY)
-agent = ReactAgent(model=model, tools=[])
-
 import re
 import json
 
@@ -67,25 +65,23 @@ def analyze_sightseeing_need(user_intent, schedule):
         f"Schedule summary:\n{schedule_snippet}"
     )
 
-    response = agent.run(prompt)
-    return extract_json_from_response(response.final_answer)
+    # 💾 Same event type + schedule snippet → same analysis, so it is cached on disk
+    # (temperature 0 and a date-free system prompt keep the cache key stable)
+    # ⚡ A yes/no decision: fast tier, escalated only if the answer is unusable
+    return get_router().structured_completion(
+        "classify", JSON_ONLY_SYSTEM_PROMPT, prompt, temperature=0,
+        validate=lambda data: isinstance(data, dict) and "is_required" in data,
+        cache=get_response_cache()
+    )
 
 def get_sightseeing_places(location, theme="cultural", limit=5):
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    params = {
-        "query": f"{theme} attractions near {location}",
-        "key": os.getenv("GOOGLE_API_KEY")
-    }
-    res = requests.get(url, params=params).json()
-    results = res.get("results", [])[:limit]
-
     return [{
-        "name": r.get("name"),
-        "rating": r.get("rating", "N/A"),
-        "address": r.get("formatted_address"),
+        "name": place.name,
+        "rating": place.rating or "N/A",
+        "address": place.address,
         "type": theme,
-        "description": r.get("types", [])
-    } for r in results]
+        "description": place.types
+    } for place in get_places_client().text_search(f"{theme} attractions near {location}", limit)]
 
 def sightseeing_agent(user_intent, schedule_data):
     location = user_intent.get("location")
@@ -0,0 +1,126 @@
+import contextvars
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# 📦 Extract JSON (object or list) from LLM output
+def extract_json_from_response(response):
+    cleaned = response.strip()
+    cleaned = re.sub(r"```(?:json|python)?", "", cleaned)
+    cleaned = cleaned.replace("“", '"').replace("”", '"').replace("‘", "'").replace("’", "'")
+
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        match = re.search(r"(\{.*\}|\[.*\])", cleaned, re.DOTALL)
+        if match:
+            try:
+                return json.loads(match.group(0))
+            except json.JSONDecodeError:
+                pass
+    raise ValueError(f"❌ Could not extract valid JSON from LLM response:\n{cleaned}")
+
+def compact_json(data):
+    """Serialize agent output without indentation to keep prompts small."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+def build_batch_prompt(sections):
+    keys = ", ".join(f'"{key}"' for key in sections)
+    payload = "\n".join(f"### {key}\n{compact_json(data)}" for key, data in sections.items())
+    return (
+        "You are a summarizer for an event planner agent.\n"
+        "Below are several sections of an event plan. For EACH section, summarize the key information "
+        "in bullet points, focusing on top recommended options only.\n"
+        f"Return a single valid JSON object whose keys are exactly: {keys}. "
+        "Each value is the summary for that section as a JSON list of bullet strings.\n"
+        "No code block markers, no explanation, no markdown outside the JSON.\n\n"
+        f"{payload}\n\n"
+        "IMPORTANT: Respond immediately with the final JSON object using only `Final Answer:` followed by the valid JSON. "
+        "Do NOT output thoughts, actions, or any reasoning."
+    )
+
+def build_section_prompt(section_name, data):
+    return (
+        f"You are a summarizer for an event planner agent.\n"
+        f"Return only a valid JSON object with no code block markers, no explanation, no markdown, no labels — just the raw JSON."
+        f"Please summarize the key information from the '{section_name}' section in bullet points, focusing on top recommended options only.\n\n"
+        f"{section_name} data:\n{compact_json(data)}"
+        "IMPORTANT: In each sub agent, Respond immediately with the final JSON object using only `Final Answer:` followed by the valid JSON. Do NOT output thoughts, actions, or any reasoning."
+    )
+
+def chunk_sections(sections, max_chars):
+    """Group sections into batches whose serialized payload stays under max_chars."""
+    batches, current, size = [], {}, 0
+    for key, data in sections.items():
+        length = len(compact_json(data))
+        if current and size + length > max_chars:
+            batches.append(current)
+            current, size = {}, 0
+        current[key] = data
+        size += length
+    if current:
+        batches.append(current)
+    return batches
+
+def _parse_batch_summary(response):
+    try:
+        parsed = extract_json_from_response(response)
+    except Exception as e:
+        print(f"⚠️ Batch summary failed, falling back per section: {e}")
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+def summarize_sections(sections, ask, summarize_one, max_chars=60000, ask_many=None):
+    """
+    Summarize all sections with as few model calls as possible.
+
+    `ask(prompt)` returns the raw model text for a batch prompt and
+    `summarize_one(key, data)` summarizes a single section; it is only used
+    for sections the batch response did not cover or could not be parsed.
+    If `ask_many(prompts)` is given (model text or None per prompt, in
+    order), all batch prompts are sent together and the per-section
+    fallbacks run concurrently. A section whose fallback fails gets an
+    error string as its summary. Returns a dict keyed like `sections`.
+    """
+    batches = chunk_sections(sections, max_chars)
+    for batch in batches:
+        print(f"\n📦 Summarizing sections: {', '.join(batch)}")
+
+    if ask_many:
+        responses = ask_many([build_batch_prompt(batch) for batch in batches])
+        parsed_batches = [_parse_batch_summary(response) if response else {} for response in responses]
+    else:
+        parsed_batches = []
+        for batch in batches:
+            try:
+                response = ask(build_batch_prompt(batch))
+            except Exception as e:
+                print(f"⚠️ Batch summary failed, falling back per section: {e}")
+                response = None
+            parsed_batches.append(_parse_batch_summary(response) if response else {})
+
+    summaries, missing = {}, {}
+    for batch, parsed in zip(batches, parsed_batches):
+        for key, data in batch.items():
+            if parsed.get(key) not in (None, "", [], {}):
+                summaries[key] = parsed[key]
+            else:
+                print(f"🔁 Re-summarizing section on its own: {key}")
+                missing[key] = data
+
+    def summarize_missing(key):
+        try:
+            return summarize_one(key, missing[key])
+        except Exception as e:
+            print(f"⚠️ Summary failed for section {key}: {e}")
+            return f"❌ Summary failed: {type(e).__name__}: {e}"
+
+    if ask_many and len(missing) > 1:
+        # Same prompt and JSON mode as the sequential path; each call keeps the caller's usage tags
+        contexts = [contextvars.copy_context() for _ in missing]
+        with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+            summaries.update(zip(missing, pool.map(lambda ctx, key: ctx.run(summarize_missing, key), contexts, missing)))
+    else:
+        for key in missing:
+            summaries[key] = summarize_missing(key)
+    return summaries
@@ -0,0 +1,44 @@
+import importlib
+
+import pytest
+
+from google_places import PlaceDetails, PlaceSummary
+
+@pytest.fixture
+def hotel_agent(monkeypatch):
+    # The agent module reads its API keys at import time
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    return importlib.import_module("hotel_booking_agent")
+
+class FakePlaces:
+    """Nearby Search finds a match only around (1, 1); text search records its queries."""
+    def __init__(self):
+        self.nearby_keywords, self.text_queries = [], []
+
+    def locate(self, venue):
+        return venue.get("point")
+
+    def nearby_search_many(self, points, radius, place_type, keyword=None, limit=None):
+        self.nearby_keywords.append(keyword)
+        return [[(PlaceSummary(place_id="near", name="Nearby Grand"), 120.0)] if point == (1, 1) else []
+                for point in points]
+
+    def details_many(self, place_ids):
+        return [PlaceDetails(place_id=place_id, name="Nearby Grand") for place_id in place_ids]
+
+    def search_details(self, query, limit):
+        self.text_queries.append(query)
+        return [(PlaceSummary(name="Text Grand"), PlaceDetails(name="Text Grand"))]
+
+def test_hotel_type_is_honoured_for_every_venue(hotel_agent, monkeypatch):
+    places = FakePlaces()
+    monkeypatch.setattr(hotel_agent, "get_places_client", lambda: places)
+    venues = [{"point": (1, 1), "address": "A"}, {"point": (2, 2), "address": "B"}, {"address": "C"}]
+
+    hotels = hotel_agent.search_hotels_near_venues(venues, "5-star")
+
+    assert places.nearby_keywords == ["5-star"]
+    assert sorted(places.text_queries) == ["5-star hotel near B", "5-star hotel near C"]
+    assert [h[0]["name"] for h in hotels] == ["Nearby Grand", "Text Grand", "Text Grand"]
+    assert hotels[0][0]["distance_m"] == 120
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from google_places import PlacesClient
+from poi_index import POIIndex
+
+VENUE = (40.71234, -74.00567)
+
+def place(place_id, lat, lng, types=("parking",)):
+    return SimpleNamespace(place_id=place_id, lat=lat, lng=lng, types=list(types))
+
+def counting_client(results):
+    """PlacesClient with no caches whose Nearby Search answers `results` and counts calls."""
+    client = PlacesClient(api_key="test", poi_index=POIIndex())
+    calls = []
+
+    def get(endpoint, url, params):
+        calls.append(params)
+        return {"status": "OK", "results": results}
+
+    client._get = get
+    return client, calls
+
+def api_result(place_id, lat, lng, types=("parking",)):
+    return {"place_id": place_id, "name": place_id, "vicinity": "somewhere", "types": list(types),
+            "geometry": {"location": {"lat": lat, "lng": lng}}}
+
+def test_known_places_without_coverage_are_not_trusted():
+    index = POIIndex()
+    index.add([place("a", 40.7123, -74.0056), place("b", 40.7124, -74.0057), place("c", 40.7125, -74.0058)])
+    assert index.query(*VENUE, 1000, "parking", limit=3) is None
+
+def test_covered_area_is_answered_locally():
+    index = POIIndex()
+    index.add([place("a", 40.7123, -74.0056)])
+    index.add_coverage(*VENUE, 1000, "parking", result_count=1)
+    hits = index.query(*VENUE, 500, "parking", limit=3)
+    assert [p.place_id for p, _ in hits] == ["a"]
+
+def test_repeat_nearby_search_is_a_local_hit():
+    client, calls = counting_client([api_result("a", 40.7125, -74.0051)])
+    first = client.nearby_search(*VENUE, radius=1000, place_type="parking", limit=3)
+    second = client.nearby_search(*VENUE, radius=1000, place_type="parking", limit=3)
+    assert [p.place_id for p in first] == [p.place_id for p in second] == ["a"]
+    assert len(calls) == 1
+    assert client.poi_index.stats()["local_hits"] == 1
+
+def test_repeat_nearby_search_many_is_a_local_hit():
+    points = [VENUE, (40.71534, -74.00867)]
+    client, calls = counting_client([api_result("a", 40.7135, -74.0071)])
+    first = client.nearby_search_many(points, radius=1000, place_type="parking", limit=3)
+    second = client.nearby_search_many(points, radius=1000, place_type="parking", limit=3)
+    assert [[p.place_id for p, _ in hits] for hits in first] == [[p.place_id for p, _ in hits] for hits in second]
+    assert len(calls) == 1
@@ -4,6 +4,7 @@ import ast
 import re
 import requests
 from agentpro import ReactAgent, create_model
+from google_places import get_places_client, map_concurrent
 
 # ✅ Use OpenAI API key
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -13,6 +14,8 @@ assert OPENAI_API_KEY, "❌ Missing OPENAI_API_KEY in environment"
 model = create_model(provider="openai", model_name="gpt-4o", api_key=OPENAI_API_KEY)
 agent = ReactAgent(model=model)
 
+TRANSPORT_INTENT_FIELDS = ["event_type", "location", "guest_count", "transport_needs", "preferences"]
+
 def extract_json_from_response(response):
     cleaned = response.strip()
     cleaned = re.sub(r"```(?:json|python)?", "", cleaned)
@@ -42,13 +45,13 @@ def analyze_transport_needs(user_intent, venues, schedule):
         "  \"vendor_types\": [\"shuttle service\", \"bus rental\"],\n"
         "  \"vehicle_estimates\": {\"cars\": 3, \"shuttles\": 2, \"buses\": 1}\n"
         "}\n\n"
-        f"user_intent = {json.dumps(user_intent, indent=2)}\n"
+        f"user_intent = {json.dumps({k: user_intent.get(k) for k in TRANSPORT_INTENT_FIELDS}, indent=2)}\n"
         f"venues = {json.dumps(venues[:2], indent=2)}\n"
         f"schedule = {json.dumps(schedule[:2], indent=2)}"
         "IMPORTANT: Respond immediately with the final JSON object using only `Final Answer:` followed by the valid JSON. Do NOT output thoughts, actions, or any reasoning."
     )
 
-    response = agent.run(prompt)
+    response = agent.run_structured(prompt)
     cleaned = extract_json_from_response(response.final_answer)
 
     try:
@@ -71,28 +74,17 @@ def analyze_transport_needs(user_intent, venues, schedule):
         raise Exception(f"LLM response could not be parsed:\n{cleaned}\n\nError: {e}")
 
 def search_vendors(location, vendor_type, limit=3):
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    params = {
-        "query": f"{vendor_type} near {location}",
-        "key": os.getenv("GOOGLE_API_KEY")
-    }
-    res = requests.get(url, params=params).json()
-    results = res.get("results", [])[:limit]
-
-    vendors = []
-    for r in results:
-        vendors.append({
-            "name": r.get("name"),
-            "type": vendor_type,
-            "address": r.get("formatted_address"),
-            "rating": r.get("rating", "N/A")
-        })
-    return vendors
+    return [{
+        "name": place.name,
+        "type": vendor_type,
+        "address": place.address,
+        "rating": place.rating or "N/A"
+    } for place in get_places_client().text_search(f"{vendor_type} near {location}", limit)]
 
 def get_nearest_transport_hubs(location):
-    airport = search_vendors(location, "international airport", limit=1)
-    railway = search_vendors(location, "intercity railway station", limit=1)
-    bus = search_vendors(location, "intercity bus terminal", limit=1)
+    # Text search on purpose: "international airport" is more specific than the airport type
+    hubs = ["international airport", "intercity railway station", "intercity bus terminal"]
+    airport, railway, bus = map_concurrent(lambda hub: search_vendors(location, hub, limit=1), hubs)
 
     return {
         "nearest_airport": airport[0] if airport else {"name": "N/A", "address": "N/A"},
@@ -100,30 +92,45 @@ def get_nearest_transport_hubs(location):
         "nearest_bus_station": bus[0] if bus else {"name": "N/A", "address": "N/A"},
     }
 
+# 🅿️ Radius (meters) for parking around a venue
+PARKING_SEARCH_RADIUS = 1000
+
 def find_parking_near_venues(venues):
-    parking_results = {}
+    targets = []
     for v in venues:
         venue_name = v.get("name")
         venue_address = v.get("address") or v.get("formatted_address")
         if not venue_name or not venue_address:
             continue
-
-        url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-        params = {
-            "query": f"parking near {venue_address}",
-            "key": os.getenv("GOOGLE_API_KEY")
-        }
-        res = requests.get(url, params=params).json()
-        results = res.get("results", [])[:3]
-
-        parking_spots = [{
-            "name": r.get("name"),
-            "address": r.get("formatted_address"),
-            "rating": r.get("rating", "N/A")
-        } for r in results]
-
-        parking_results[venue_name] = parking_spots
-    return parking_results
+        targets.append((venue_name, venue_address, v))
+
+    # 📍 One nearby search per cluster of venues; each venue gets its nearest spots
+    places = get_places_client()
+    coordinates = map_concurrent(lambda target: places.locate(target[2]), targets)
+    located = [i for i, point in enumerate(coordinates) if point]
+    nearby = places.nearby_search_many([coordinates[i] for i in located], radius=PARKING_SEARCH_RADIUS,
+                                       place_type="parking", limit=3)
+
+    spots = [None] * len(targets)
+    for i, hits in zip(located, nearby):
+        spots[i] = [{
+            "name": place.name,
+            "address": place.address,
+            "rating": place.rating or "N/A",
+            "distance_m": round(distance)
+        } for place, distance in hits]
+
+    # Venues without a known location fall back to a text search
+    missing = [i for i, found in enumerate(spots) if found is None]
+    fallback = map_concurrent(lambda i: places.text_search(f"parking near {targets[i][1]}", 3), missing)
+    for i, hits in zip(missing, fallback):
+        spots[i] = [{
+            "name": place.name,
+            "address": place.address,
+            "rating": place.rating or "N/A"
+        } for place in hits]
+
+    return {venue_name: found for (venue_name, _, _), found in zip(targets, spots)}
 
 def transport_parking_agent(user_intent, venue_data, schedule_data):
     location = user_intent.get("location")
@@ -140,10 +147,10 @@ def transport_parking_agent(user_intent, venue_data, schedule_data):
     vehicle_estimates = transport_plan.get("vehicle_estimates", {})
 
     vendor_recs = []
-    for vtype in vendor_types:
+    for vtype, options in zip(vendor_types, map_concurrent(lambda vtype: search_vendors(location, vtype), vendor_types)):
         vendor_recs.append({
             "vendor_type": vtype,
-            "options": search_vendors(location, vtype)
+            "options": options
         })
 
     return {
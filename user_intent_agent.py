@@ -9,7 +9,7 @@ import dateparser
 sys.path.insert(0, "/content/AgentPro")
 
 # ✅ AgentPro imports
-from agentpro import ReactAgent, create_model
+from agentpro import ReactAgent, create_model, get_router
 from agentpro.tools import UserInputTool  # optional
 
 # ✅ Create model wrapper (this solves the .chat_completion error)
@@ -40,8 +40,9 @@ def extract_json_from_response(response):
     raise ValueError(f"❌ Could not extract valid JSON from LLM response:\n{cleaned}")
 
 # 🚀 Main user intent extraction
-def extract_user_intent():
-    user_query = input("👤 Please describe the event you want to plan (type, location, guests, etc.):\n> ")
+def extract_user_intent(user_query=None):
+    if user_query is None:
+        user_query = input("👤 Please describe the event you want to plan (type, location, guests, etc.):\n> ")
 
     prompt = (
       "You are an event planning assistant.\n"
@@ -64,12 +65,20 @@ def extract_user_intent():
 )
 
 
-    print("🔁 Querying GPT-4o via ReAct agent...")
-    response = agent.run(prompt)
-    raw_output = response.final_answer
-    print("🧠 LLM RAW OUTPUT:\n", raw_output)
-
-    intent_data = extract_json_from_response(raw_output)
+    # ⚡ Extraction runs on the fast tier; the strong model is only used if the result is unusable
+    print("🔁 Extracting intent via model router...")
+    try:
+        intent_data = get_router().structured_completion(
+            "extract", agent.structured_system_prompt, prompt,
+            validate=lambda data: isinstance(data, dict) and "event_type" in data and "location" in data
+        )
+        print("🧠 LLM OUTPUT:\n", json.dumps(intent_data))
+    except ValueError as e:
+        # 🔁 Every tier failed: fall back to the ReAct loop, as run_structured does
+        print(f"❌ Structured extraction failed, falling back to ReAct loop: {e}")
+        raw_output = agent.run(prompt).final_answer
+        print("🧠 LLM RAW OUTPUT:\n", raw_output)
+        intent_data = extract_json_from_response(raw_output)
 
     if intent_data.get("event_date"):
         parsed_date = dateparser.parse(intent_data["event_date"])
@@ -80,4 +89,5 @@ def extract_user_intent():
     return intent_data
 
 # Run the extraction
-extracted_intent = extract_user_intent()
+if __name__ == "__main__":
+    extracted_intent = extract_user_intent()
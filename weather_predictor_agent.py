@@ -1,6 +1,7 @@
 import requests
 from datetime import datetime, timedelta
 import os
+from google_places import HTTP_TIMEOUT, get_places_client
 
 # --- Weather Code Descriptions ---
 WEATHER_CODE_DESCRIPTIONS = {
@@ -16,14 +17,10 @@ WEATHER_CODE_DESCRIPTIONS = {
 
 # --- Get Coordinates from Google Maps ---
 def get_coordinates(city):
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
-    params = {"address": city, "key": os.getenv("GOOGLE_API_KEY")}
-    response = requests.get(url, params=params)
-    data = response.json()
-    if not data.get("results"):
+    coordinates = get_places_client().geocode(city)
+    if not coordinates:
         raise Exception(f"Could not determine coordinates for: {city}")
-    location = data["results"][0]["geometry"]["location"]
-    return location["lat"], location["lng"]
+    return coordinates
 
 # --- Get Forecast from Open-Meteo ---
 def get_open_meteo_forecast(lat, lon):
@@ -35,7 +32,7 @@ def get_open_meteo_forecast(lat, lon):
         "timezone": "auto",
         "forecast_days": 16
     }
-    response = requests.get(url, params=params)
+    response = requests.get(url, params=params, timeout=HTTP_TIMEOUT)
     data = response.json()
     return data.get("daily", {})
 